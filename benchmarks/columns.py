@@ -0,0 +1,69 @@
+"""
+Compares decoding a large json list into columns with ``decode_columns``
+against ``json.loads`` followed by copying the dicts into the same columns.
+
+    $ python benchmarks/columns.py [rows]
+"""
+import array
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from operator import itemgetter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slumber.columns import decode_columns  # noqa: E402
+
+SCHEMA = [("id", "q"), ("price", "d"), ("quantity", "q"), ("name", None), ("status", None), ("score", "d")]
+
+
+def body(rows):
+    objects = [{"id": i, "price": i * 0.5, "quantity": i % 7, "name": "item %d" % i, "status": "open",
+                "score": i / 3.0} for i in range(rows)]
+    return json.dumps({"meta": {"total_count": rows}, "objects": objects}).encode("utf-8")
+
+
+def loads(content):
+    objects = json.loads(content)["objects"]
+    columns = {}
+    for name, typecode in SCHEMA:
+        values = map(itemgetter(name), objects)
+        columns[name] = array.array(typecode, values) if typecode else list(values)
+    return columns
+
+
+def columns(content):
+    return decode_columns(SCHEMA, content=content)
+
+
+def measure(function, content, runs):
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        function(content)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    function(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    content = body(rows)
+    assert loads(content) == columns(content)
+    print("%d rows, %.1fMB body" % (rows, len(content) / 1e6))
+    for name, function in [("json.loads", loads), ("decode_columns", columns)]:
+        best, peak = measure(function, content, 5)
+        print("%-15s best %7.3fs  peak %7.1fMB" % (name, best, peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Measures how long ``import slumber`` takes in a fresh interpreter.
+
+    $ python benchmarks/import_time.py [runs]
+"""
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = "import time; t = time.time(); import %s; print(time.time() - t)"
+
+
+def measure(module, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", SNIPPET % module], cwd=BASE_DIR)
+        timings.append(float(output.decode("ascii").strip()))
+    timings.sort()
+    return timings[len(timings) // 2], timings[0]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for module in ["slumber", "requests", "yaml"]:
+        median, best = measure(module, runs)
+        print("import %-10s median %7.2fms  best %7.2fms" % (module, median * 1000, best * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-import requests
+import binascii
+import os
+import types
 
 try:
     from urllib.parse import urlparse, urlsplit, urlunsplit
@@ -6,10 +8,21 @@ except ImportError:
     from urlparse import urlparse, urlsplit, urlunsplit
 
 from . import exceptions
+from .metrics import MetricsRegistry, clock, normalize_path
+from .process import cache_ttl, check_fork, credentials_key, is_conditional, register_fork_handler, reset_session
+from .records import get_decoder
+from .response import LazyResponse, Result, make_response
 from .serialize import Serializer
-from .utils import url_join, iterator, copy_kwargs
+from .tracing import NULL_SPAN
+from .utils import url_join, iterator, copy_kwargs, compile_fields, field_paths, project, request_key
 
-__all__ = ["Resource", "API"]
+__all__ = ["Resource", "API", "LazyResponse", "Result"]
+
+# Methods which can safely be sent again if they may not have reached the server.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# Methods which change the resource they are sent to.
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
 
 
 class ResourceAttributesMixin(object):
@@ -46,7 +59,10 @@ class ResourceAttributesMixin(object):
         methods = self._get_methods()
         if item not in methods.keys():
             kwargs = copy_kwargs(self._store)
+            kwargs.pop("collection_url", None)
             kwargs.update({"base_url": url_join(self._store["base_url"], item)})
+            if kwargs.get("template") is not None:
+                kwargs["template"] = url_join(kwargs["template"], item)
             return self._get_resource(**kwargs)
         self._call = methods[item]
         return self
@@ -88,8 +104,12 @@ class Resource(ResourceAttributesMixin, object):
 
         kwargs = copy_kwargs(self._store)
 
-        if id is not None:
+        if res_id is not None:
             kwargs["base_url"] = url_join(self._store["base_url"], res_id)
+            kwargs["collection_url"] = self._store["base_url"]
+
+        if res_id is not None and kwargs.get("template") is not None:
+            kwargs["template"] = url_join(kwargs["template"], "{id}")
 
         if res_format is not None:
             kwargs["format"] = res_format
@@ -99,84 +119,435 @@ class Resource(ResourceAttributesMixin, object):
             #    of handling the case when a POST/PUT doesn't return an object
             #    but a Location to an object that we need to GET.
             kwargs["base_url"] = url_override
+            kwargs["template"] = None
+            kwargs.pop("collection_url", None)
 
         kwargs["session"] = self._store["session"]
 
         return self._get_resource(**kwargs)
 
-    def _request(self, method, data=None, files=None, params=None):
-        serializer = self._store["serializer"]
+    def _request(self, method, data=None, files=None, params=None, priority=None, headers=None, stream=False):
+        serializer = self._store["serializer"].get_serializer(self._store.get("format"))
         url = self.url()
 
+        extra_headers = headers
         headers = {"accept": serializer.get_content_type()}
 
+        if extra_headers:
+            headers.update(extra_headers)
+
         if not files:
             headers["content-type"] = serializer.get_content_type()
             if data is not None:
-                data = serializer.dumps(data)
-
-        resp = self._store["session"].request(method, url, data=data, params=params, files=files,
-                                              headers=headers)
+                with self._span("serialize"):
+                    data = serializer.dumps(data)
+
+        metrics = self._store.get("metrics")
+        options = {"stream": True} if stream else {}
+        start = clock()
+
+        try:
+            with self._span("network") as span:
+                if span.traceparent is not None:
+                    headers["traceparent"] = span.traceparent
+                resp = self._send(method, url, priority, data=data, params=params, files=files, headers=headers,
+                                  **options)
+                if stream:
+                    # Reading the body here would defeat streaming it
+                    bytes_in = int(resp.headers.get("content-length") or 0)
+                else:
+                    bytes_in = self._body_size(resp.content)
+                span.set_attribute("http.status_code", resp.status_code)
+                span.set_attribute("http.request_size", self._body_size(data))
+                span.set_attribute("http.response_size", bytes_in)
+        except exceptions.transport_exceptions() as exc:
+            if metrics is not None:
+                metrics.record(method, self._template(), clock() - start, error="transport",
+                               bytes_out=self._body_size(data))
+            raise exceptions.transport_error(exc, self._is_idempotent(method, headers, data))
+
+        if metrics is not None:
+            error = None
+            if 400 <= resp.status_code <= 499:
+                error = "HttpClientError"
+            elif 500 <= resp.status_code <= 599:
+                error = "HttpServerError"
+            metrics.record(method, self._template(), clock() - start, error=error,
+                           bytes_in=bytes_in, bytes_out=self._body_size(data))
 
         # TODO: Deprecate custom exceptions and pass through requests exceptions
         if 400 <= resp.status_code <= 499:
             exception_class = exceptions.HttpNotFoundError if resp.status_code == 404 else exceptions.HttpClientError
-            raise exception_class("Client Error %s: %s" % (resp.status_code, url), response=resp, content=resp.content)
+            raise exception_class("Client Error %s: %s" % (resp.status_code, url), response=resp)
         elif 500 <= resp.status_code <= 599:
-            raise exceptions.HttpServerError("Server Error %s: %s" % (resp.status_code, url),
-                                             response=resp, content=resp.content)
+            raise exceptions.HttpServerError("Server Error %s: %s" % (resp.status_code, url), response=resp)
+
+        return resp
+
+    def _span(self, name, **attributes):
+        tracer = self._store.get("tracer")
+        if tracer is None:
+            return NULL_SPAN
+        return tracer.span(name, **attributes)
 
-        self._ = resp
+    def _send(self, method, url, priority=None, **kwargs):
+        objects = self._store.get("object_cache")
+        if objects is None:
+            return self._shared_send(method, url, priority, **kwargs)
 
+        if method in WRITE_METHODS:
+            try:
+                return self._shared_send(method, url, priority, **kwargs)
+            finally:
+                objects.invalidate(url)
+
+        if method != "GET" or kwargs.get("stream") or is_conditional(kwargs.get("headers")):
+            return self._shared_send(method, url, priority, **kwargs)
+
+        cached = objects.get(url, kwargs.get("params"))
+        if cached is not None:
+            status_code, content_type, content = cached
+            return make_response(status_code, {"content-type": content_type}, content, url=url)
+
+        resp = self._shared_send(method, url, priority, **kwargs)
+        if resp.status_code == 200:
+            ttl = cache_ttl(resp.headers, objects.ttl)
+            if ttl is not None:
+                objects.set(url, kwargs.get("params"), resp.status_code, resp.headers.get("content-type"),
+                            resp.content, ttl=ttl)
         return resp
 
+    def _shared_send(self, method, url, priority=None, **kwargs):
+        cache = self._store.get("shared_cache")
+        if cache is None:
+            return self._hedged_send(method, url, priority, **kwargs)
+
+        credentials = credentials_key(self._store["session"], kwargs.get("headers"))
+        if method in WRITE_METHODS:
+            try:
+                return self._hedged_send(method, url, priority, **kwargs)
+            finally:
+                # Entries are hashed, so only those without a query string can
+                # be found again.
+                path = url.split("?", 1)[0]
+                parent = path.rstrip("/").rsplit("/", 1)[0] + ("/" if path.endswith("/") else "")
+                for target in (path, parent):
+                    cache.delete(self._shared_key(target, None, credentials))
+
+        if method != "GET" or kwargs.get("stream") or is_conditional(kwargs.get("headers")):
+            return self._hedged_send(method, url, priority, **kwargs)
+
+        key = self._shared_key(url, kwargs.get("params"), credentials)
+        cached = cache.get(key)
+        if cached is not None:
+            status_code, content_type, content = cached
+            return make_response(status_code, {"content-type": content_type}, content, url=url)
+
+        resp = self._hedged_send(method, url, priority, **kwargs)
+        if resp.status_code == 200:
+            ttl = cache_ttl(resp.headers, cache.ttl)
+            if ttl is not None:
+                cache.set(key, resp.status_code, resp.headers.get("content-type"), resp.content, ttl=ttl)
+        return resp
+
+    def _shared_key(self, url, params, credentials):
+        key = request_key("GET", url, params)
+        return "%s %s" % (key, credentials) if credentials else key
+
+    def _hedged_send(self, method, url, priority=None, **kwargs):
+        hedge = self._store.get("hedge")
+        headers = kwargs.get("headers")
+        # Only GETs and requests with an idempotency key: the copy of a
+        # DELETE which loses the race would get a 404, for one
+        if hedge is not None and (method == "GET" or self._has_idempotency_key(headers) and
+                                  self._is_idempotent(method, headers, kwargs.get("data"))):
+            metrics = self._store.get("metrics")
+            histogram = metrics.histogram(method, self._template()) if metrics is not None else None
+            return hedge.run(lambda: self._dispatch(method, url, priority, **kwargs), hedge.get_delay(histogram))
+
+        return self._dispatch(method, url, priority, **kwargs)
+
+    def _dispatch(self, method, url, priority=None, **kwargs):
+        check_fork()
+
+        pool = self._store.get("pool")
+        if pool is None:
+            return self._transmit(method, url, priority, kwargs)
+
+        tried = []
+        while True:
+            endpoint = pool.acquire(exclude=tried)
+            start = clock()
+            try:
+                resp = self._transmit(method, pool.rewrite(url, endpoint), priority, kwargs)
+            except exceptions.transport_exceptions() as exc:
+                pool.release(endpoint, clock() - start, ok=False)
+                tried.append(endpoint)
+                # Fail over to another endpoint when the request never left, or
+                # the connection dropped and the request can safely be repeated
+                error = exceptions.classify(exc)
+                if len(tried) >= len(pool) or (error.request_sent and not (
+                        error is exceptions.ReadError and
+                        self._is_idempotent(method, kwargs.get("headers"), kwargs.get("data")))):
+                    raise
+                continue
+
+            pool.release(endpoint, clock() - start, ok=resp.status_code < 500)
+            return resp
+
+    def _is_idempotent(self, method, headers=None, data=None):
+        # A body which can only be read once (a generator, such as an ndjson
+        # upload, or a file) would be sent empty the second time
+        if hasattr(data, "read") or hasattr(data, "__next__") or hasattr(data, "next"):
+            return False
+        return method in IDEMPOTENT_METHODS or self._has_idempotency_key(headers)
+
+    def _has_idempotency_key(self, headers):
+        header = self._store.get("idempotency_header")
+        return header is not None and bool(headers) and header in headers
+
+    def _idempotency_headers(self, method, key=None):
+        header = self._store.get("idempotency_header")
+        if header is None or (key is None and method not in self._store["idempotency_methods"]):
+            return None
+        return {header: key if key is not None else binascii.hexlify(os.urandom(16)).decode("ascii")}
+
+    def _transmit(self, method, url, priority, kwargs):
+        session = self._store["session"]
+        limiter = self._store.get("limiter")
+        if limiter is None:
+            return session.request(method, url, **kwargs)
+
+        return limiter.call(lambda: session.request(method, url, **kwargs), priority, urlsplit(url).netloc)
+
+    def _body_size(self, body):
+        try:
+            return len(body)
+        except TypeError:
+            return 0
+
+    def _template(self):
+        template = self._store.get("template")
+        if template is None:
+            return normalize_path(self.url())
+
+        if self._store["append_slash"] and not template.endswith("/"):
+            template = template + "/"
+        return template
+
     def _handle_redirect(self, resp, **kwargs):
         # @@@ Hacky, see description in __call__
         resource_obj = self(url_override=resp.headers["location"])
         return resource_obj.get(**kwargs)
 
     def _try_to_serialize_response(self, resp):
-        s = self._store["serializer"]
         if resp.status_code in [204, 205]:
             return
+        return self._deserialize(resp.headers.get("content-type", None), resp.content)
+
+    def _deserialize(self, content_type, content):
+        s = self._store["serializer"]
 
-        if resp.headers.get("content-type", None) and resp.content:
-            content_type = resp.headers.get("content-type").split(";")[0].strip()
+        if content_type and content:
+            content_type, _, options = content_type.partition(";")
+            content_type = content_type.strip()
 
             try:
                 stype = s.get_serializer(content_type=content_type)
             except exceptions.SerializerNotAvailable:
-                return resp.content
+                return content
 
-            if type(resp.content) == bytes:
+            if isinstance(content, (bytes, memoryview)):
                 try:
-                    encoding = requests.utils.guess_json_utf(resp.content)
-                    return stype.loads(resp.content.decode(encoding))
+                    return stype.loads_bytes(content, self._charset(options))
                 except:
-                    return resp.content
-            return stype.loads(resp.content)
+                    return content
+            return stype.loads(content)
         else:
-            return resp.content
+            return content
+
+    def _charset(self, options):
+        for option in options.split(";"):
+            name, _, value = option.partition("=")
+            if name.strip().lower() == "charset":
+                return value.strip().strip('"') or None
+        return None
+
+    def _finalize(self, data, selector=None):
+        if data is None or isinstance(data, bytes):
+            return data
+
+        if isinstance(data, types.GeneratorType):
+            # Streaming serializers decode one object at a time
+            return (self._finalize(item, selector) for item in data)
+
+        if selector is not None:
+            data = project(data, selector)
 
-    def _process_response(self, resp):
-        self._store["api"]._set_response(resp)
+        decoder = self._get_record_decoder()
+        if decoder is not None:
+            data = decoder(data)
+
+        return data
+
+    def _get_record_decoder(self):
+        records = self._store.get("records")
+        if not records:
+            return None
+
+        decoder = records.get(self._store["base_url"].rstrip("/"))
+        if decoder is None and self._store.get("collection_url") is not None:
+            # A detail resource (``api.users(5)``) decodes like its collection
+            decoder = records.get(self._store["collection_url"].rstrip("/"))
+        return decoder
+
+    def decode_as(self, record_class):
+        """
+        Registers record_class as the type objects returned by this resource
+        (and its detail resources) are decoded into, instead of dicts.
+        """
+        if "records" not in self._store:
+            raise exceptions.ImproperlyConfigured("decode_as requires a resource created through an API")
+        self._store["records"][self._store["base_url"].rstrip("/")] = get_decoder(record_class)
+        return self
+
+    def get_many(self, ids, style="in", **kwargs):
+        """
+        Fetches the objects of this collection with the given ids using as
+        few requests as possible, either ``?id__in=1,2,3`` (style ``"in"``)
+        or Tastypie's ``set/1;2;3/`` (style ``"set"``). Returns a list in
+        the order of ids, with None for the ids listed in its ``missing``.
+        """
+        from .batch import get_many
+        return get_many(self, ids, style=style, **kwargs)
+
+    def aiter(self, **kwargs):
+        """
+        Returns an async iterator over the objects of this collection, see
+        ``slumber.aio.aiter``. Requires Python 3.6 or newer.
+        """
+        from .aio import aiter
+        return aiter(self, **kwargs)
+
+    def _lazy_response(self, resp, selector=None):
+        content_type = resp.headers.get("content-type", None)
+
+        if resp.status_code in [204, 205]:
+            loader = lambda content: None
+        else:
+            loader = lambda content: self._finalize(self._deserialize(content_type, content), selector)
+
+        return LazyResponse(resp.status_code, resp.headers, resp.content, loader)
+
+    def _stream_response(self, resp, selector=None):
+        content_type = (resp.headers.get("content-type") or "").split(";")[0].strip()
+        try:
+            stype = self._store["serializer"].get_serializer(content_type=content_type)
+        except exceptions.SerializerNotAvailable:
+            stype = None
+
+        if not hasattr(stype, "iter_loads"):
+            return self._finalize(self._try_to_serialize_response(resp), selector)
+        return self._finalize(stype.iter_loads(resp.iter_lines()), selector)
+
+    def _columns_response(self, resp, columns, stream=False):
+        from .columns import decode_columns
+
+        kind, schema = columns
+        content_type = (resp.headers.get("content-type") or "").split(";")[0].strip()
+        try:
+            key = self._store["serializer"].get_serializer(content_type=content_type).key
+        except exceptions.SerializerNotAvailable:
+            key = None
+
+        if key == "ndjson":
+            if stream:
+                return decode_columns(schema, kind, lines=resp.iter_lines())
+            return decode_columns(schema, kind, content=resp.content, ndjson=True)
+        if key == "json":
+            return decode_columns(schema, kind, content=resp.content)
+        return decode_columns(schema, kind, data=self._try_to_serialize_response(resp))
+
+    def _process_response(self, resp, lazy=False, selector=None, elapsed=None, stream=False, columns=None):
+        if elapsed is None:
+            # Result mode leaves the shared API state alone and doesn't keep
+            # the response (and its body) alive on the resource.
+            self._store["api"]._set_response(resp)
+            self._ = resp
 
         if 200 <= resp.status_code <= 299:
-            return self._try_to_serialize_response(resp)
+            if columns is not None:
+                with self._span("deserialize"):
+                    data = self._columns_response(resp, columns, stream=stream)
+            elif stream:
+                data = self._stream_response(resp, selector=selector)
+            elif lazy:
+                data = self._lazy_response(resp, selector=selector)
+            else:
+                with self._span("deserialize"):
+                    data = self._finalize(self._try_to_serialize_response(resp), selector)
         else:
-            return  # @@@ We should probably do some sort of error here? (Is this even possible?)
+            data = None  # @@@ We should probably do some sort of error here? (Is this even possible?)
 
-    def _perform_action(self, **kwargs):
-        method = self._call['method']
+        if elapsed is not None:
+            return Result.from_response(resp, data, elapsed)
+        return data
 
-        if self._call['has_data']:
-            data = kwargs.pop('data', None)
-            files = kwargs.pop('files', None)
-            resp = self._request(method, data=data, files=files, params=kwargs)
-        else:
-            resp = self._request(method, params=kwargs)
+    def _fields_params(self, fields):
+        param = self._store.get("fields_param", "fields")
+        if param is None:
+            return {}
+
+        style = self._store.get("fields_style", "comma")
+        if style == "comma":
+            return {param: ",".join(field_paths(fields))}
+        elif style == "repeat":
+            return {param: field_paths(fields)}
+        raise exceptions.ImproperlyConfigured("%s is not a valid fields_style" % style)
 
-        return self._process_response(resp)
+    def _perform_action(self, **kwargs):
+        method = self._call['method']
+        lazy = kwargs.pop('_lazy', self._store.get('lazy', False))
+        fields = kwargs.pop('_fields', None)
+        result = kwargs.pop('_result', self._store.get('return_result', False))
+        priority = kwargs.pop('_priority', None)
+        stream = kwargs.pop('_stream', False)
+        columns = kwargs.pop('_as', None)
+        if columns is not None:
+            from .columns import KINDS
+
+            if columns not in KINDS:
+                raise exceptions.ImproperlyConfigured("%s is not a valid _as" % columns)
+            if not kwargs.get('_columns'):
+                raise exceptions.ImproperlyConfigured("_as=%r requires _columns" % columns)
+            columns = (columns, kwargs.pop('_columns'))
+        # One key per logical call, shared by every retry or hedge of it
+        headers = self._idempotency_headers(method, kwargs.pop('_idempotency_key', None))
+
+        selector = None
+        if fields:
+            selector = compile_fields(fields)
+            kwargs.update(self._fields_params(fields))
+
+        span = NULL_SPAN
+        if self._store.get("tracer") is not None:
+            span = self._span("%s %s" % (method, self._template()), **{"http.method": method, "http.url": self.url()})
+
+        with span:
+            start = clock()
+
+            if self._call['has_data']:
+                data = kwargs.pop('data', None)
+                files = kwargs.pop('files', None)
+                resp = self._request(method, data=data, files=files, params=kwargs, priority=priority,
+                                     headers=headers, stream=stream)
+            else:
+                resp = self._request(method, params=kwargs, priority=priority, headers=headers, stream=stream)
+
+            elapsed = clock() - start if result else None
+
+            return self._process_response(resp, lazy=lazy, selector=selector, elapsed=elapsed, stream=stream,
+                                          columns=columns)
 
     def url(self):
         url = self._store["base_url"]
@@ -195,22 +566,80 @@ class API(ResourceAttributesMixin, object):
     resource_class = Resource
 
     def __init__(self, base_url=None, auth=None, res_format=None, append_slash=True, session=None,
-                 serializer=None):
+                 serializer=None, lazy=False, fields_param="fields", fields_style="comma",
+                 metrics=True, return_result=False, balancer="round_robin",
+                 hedge=None, shared_cache=None, fork_safe=True, limiter=None, idempotency_header=None,
+                 idempotency_methods=("POST", "PATCH"), tracer=None, slow_calls=None,
+                 object_cache=None):
         if serializer is None:
             serializer = Serializer(default=res_format)
 
         if session is None:
+            import requests
             session = requests.session()
 
         if auth is not None:
             session.auth = auth
 
+        pool = None
+        if isinstance(base_url, (list, tuple)):
+            from .balancer import EndpointPool
+            pool = EndpointPool(base_url, policy=balancer)
+            base_url = base_url[0]
+        elif balancer is not None and not isinstance(balancer, str):
+            pool = balancer
+            base_url = pool.base_url
+
+        if hedge is True:
+            from .hedging import HedgePolicy
+            hedge = HedgePolicy()
+
+        if object_cache is True:
+            from .cache import ObjectCache
+            object_cache = ObjectCache()
+
+        if slow_calls is not None:
+            if not hasattr(slow_calls, "on_end"):
+                from .slowcalls import SlowCallLog
+                slow_calls = SlowCallLog(threshold=slow_calls)
+            if tracer is None:
+                from .tracing import Tracer
+                tracer = Tracer(propagate=False)
+            tracer.add_processor(slow_calls)
+
+        if metrics is True:
+            metrics = MetricsRegistry()
+        elif metrics is False:
+            metrics = None
+
+        if fork_safe:
+            register_fork_handler(session, reset_session)
+            for policy in (hedge, limiter, object_cache, pool, metrics):
+                # User supplied objects may not have any state to reset
+                after_fork = getattr(type(policy), "_after_fork", None)
+                if after_fork is not None:
+                    register_fork_handler(policy, after_fork)
+
         self._store = {
             "base_url": base_url,
-            "format": res_format if res_format is not None else "json",
+            "format": res_format if res_format is not None else serializer.default,
             "append_slash": append_slash,
             "session": session,
             "serializer": serializer,
+            "lazy": lazy,
+            "records": {},
+            "metrics": metrics,
+            "return_result": return_result,
+            "pool": pool,
+            "hedge": hedge,
+            "shared_cache": shared_cache,
+            "object_cache": object_cache,
+            "limiter": limiter,
+            "idempotency_header": idempotency_header,
+            "idempotency_methods": idempotency_methods,
+            "tracer": tracer,
+            "fields_param": fields_param,
+            "fields_style": fields_style,
             "api": self
         }
 
@@ -218,6 +647,43 @@ class API(ResourceAttributesMixin, object):
         if self._store.get("base_url") is None:
             raise exceptions.ImproperlyConfigured("base_url is required")
 
+        self._store["template"] = urlsplit(base_url).path or "/"
+
+    @classmethod
+    def from_schema(cls, source, base_url=None, cache_dir=None, max_age=None, **kwargs):
+        """
+        Builds an API from a Tastypie or OpenAPI schema, read from a file or
+        fetched from a url. The resources of the returned API are real
+        attributes with only the methods the schema allows, so unknown names
+        raise AttributeError without a round trip to the server.
+        """
+        from .schema import load_schema, parse_schema, schema_base_url, compile_api
+
+        # The schema is fetched with the session (and auth) of the API
+        if kwargs.get("session") is None:
+            import requests
+            kwargs["session"] = requests.session()
+        if kwargs.get("auth") is not None:
+            kwargs["session"].auth = kwargs["auth"]
+
+        schema = load_schema(source, session=kwargs["session"], cache_dir=cache_dir, max_age=max_age)
+
+        if base_url is None:
+            base_url = schema_base_url(schema)
+        if base_url is None and "://" in source:
+            # Tastypie serves its top level schema at the api root
+            base_url = source
+
+        return compile_api(cls, parse_schema(schema))(base_url, **kwargs)
+
+    def compile(self, path):
+        """
+        Returns a URLTemplate for path, a resource path relative to this API
+        with ``{placeholders}`` for ids, e.g. ``"users/{uid}/posts"``.
+        """
+        from .template import URLTemplate
+        return URLTemplate(self, path)
+
     def _get_resource(self, **kwargs):
         return self.resource_class(**kwargs)
 
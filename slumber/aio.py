@@ -0,0 +1,153 @@
+"""
+asyncio helpers for slumber, which run the (blocking) requests of a Resource
+in worker threads and hand their results to the event loop through bounded
+queues, so a slow consumer holds back the producers instead of letting
+responses pile up in memory. Requires Python 3.6 or newer.
+"""
+import asyncio
+import collections
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from .utils import copy_kwargs, paginate
+
+__all__ = ["aiter", "amap"]
+
+_DONE = object()
+
+
+class _Error(object):
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _get_loop():
+    return getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+
+
+def _chunks(resource, params, stream, chunk_size):
+    target = resource._get_resource(**copy_kwargs(resource._store))
+    query = dict(params)
+    while query is not None:
+        data = target.get(_stream=stream, _lazy=False, _result=False, **query)
+
+        if isinstance(data, types.GeneratorType):
+            chunk = []
+            for obj in data:
+                chunk.append(obj)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+            return
+
+        objects, query = paginate(data)
+        yield objects if isinstance(objects, list) else [objects]
+
+
+async def aiter(resource, prefetch=2, stream=False, chunk_size=100, **params):
+    """
+    Yields the objects of a collection, following Tastypie pagination
+    (``meta.next``) or, with stream, decoding a streamed ndjson response.
+    Pages (or chunk_size objects of a stream) are fetched in a worker thread
+    at most prefetch ahead of the consumer. params are sent as query
+    parameters.
+    """
+    loop = _get_loop()
+    queue = asyncio.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item):
+        # Blocks the worker thread until the queue has room, or the consumer
+        # went away (possibly along with its event loop).
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except TimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    return False
+
+    def produce():
+        try:
+            for chunk in _chunks(resource, params, stream, chunk_size):
+                if stop.is_set() or not put(chunk):
+                    return
+            item = _DONE
+        except Exception as exc:
+            item = _Error(exc)
+        if not stop.is_set():
+            put(item)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Error):
+                raise item.exc
+            for obj in item:
+                yield obj
+    finally:
+        # Let a worker blocked on a full queue finish; it stops before
+        # fetching the next page.
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def amap(resource, ids, concurrency=None, **params):
+    """
+    Yields ``resource(id).get(**params)`` for every id, in order, with at
+    most concurrency requests in flight. ids may be any iterable, including
+    a generator; it is only consumed as requests complete.
+
+    concurrency defaults to the current limit of the API's limiter, which
+    is read again as requests complete so an adaptive limit is followed,
+    and to 8 without a limiter.
+    """
+    loop = _get_loop()
+    limiter = resource._store.get("limiter")
+    if concurrency is None and limiter is not None:
+        # Threads are only started as the limit grows
+        executor = ThreadPoolExecutor(max_workers=max(limiter.max_limit, 1))
+
+        def limit():
+            return max(limiter.limit, 1)
+    else:
+        concurrency = concurrency or 8
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        def limit():
+            return concurrency
+
+    pending = collections.deque()
+    ids = iter(ids)
+
+    def fetch(res_id):
+        return resource(res_id).get(_lazy=False, _result=False, **params)
+
+    def fill():
+        while len(pending) < limit():
+            try:
+                res_id = next(ids)
+            except StopIteration:
+                return
+            pending.append(loop.run_in_executor(executor, fetch, res_id))
+
+    try:
+        fill()
+        while pending:
+            result = await pending.popleft()
+            fill()
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+
+from . import exceptions
+
+__all__ = ["Endpoint", "EndpointPool", "POLICIES"]
+
+POLICIES = ("round_robin", "least_outstanding", "ewma")
+
+
+class Endpoint(object):
+    """
+    One base url of an EndpointPool and what the pool knows about it.
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.failures = 0
+        self.ejected_until = None
+
+    def available(self, now):
+        return self.ejected_until is None or self.ejected_until <= now
+
+    def snapshot(self):
+        return {
+            "outstanding": self.outstanding,
+            "ewma": self.ewma,
+            "failures": self.failures,
+            "ejected": self.ejected_until is not None and self.ejected_until > time.time(),
+        }
+
+    def __repr__(self):
+        return "<Endpoint %s>" % self.url
+
+
+class EndpointPool(object):
+    """
+    A set of base urls serving the same API. Resources keep building urls
+    against the first one; the pool swaps in the selected endpoint right
+    before each request is sent.
+
+    policy picks the endpoint for a request: ``round_robin``,
+    ``least_outstanding`` (fewest requests in flight) or ``ewma`` (lowest
+    latency moving average, weighted by requests in flight).
+
+    An endpoint is ejected for eject_time seconds after max_failures
+    consecutive failures (transport errors and 5xx responses), after which
+    it gets one request to prove itself again. health_check, a callable
+    taking an endpoint url and returning a bool, is used by
+    ``check_health()``.
+    """
+
+    def __init__(self, urls, policy="round_robin", max_failures=5, eject_time=30.0, health_check=None,
+                 decay=0.3):
+        if not urls:
+            raise exceptions.ImproperlyConfigured("EndpointPool requires at least one url")
+        if policy not in POLICIES:
+            raise exceptions.ImproperlyConfigured("%s is not a valid balancing policy" % policy)
+
+        self.base_url = urls[0].rstrip("/")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.policy = policy
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self.health_check = health_check
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def _after_fork(self):
+        # Requests outstanding in the parent don't exist in the child
+        self._lock = threading.Lock()
+        for endpoint in self.endpoints:
+            endpoint.outstanding = 0
+
+    def acquire(self, exclude=()):
+        """
+        Picks an endpoint for a request and counts it as outstanding until
+        ``release`` is called. Endpoints in exclude are only picked if there
+        is nothing else left; ejected endpoints only if all are ejected.
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.available(now) and e not in exclude]
+            if not candidates:
+                candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+
+            if self.policy == "round_robin":
+                endpoint = candidates[next(self._counter) % len(candidates)]
+            elif self.policy == "least_outstanding":
+                offset = next(self._counter)
+                rotated = candidates[offset % len(candidates):] + candidates[:offset % len(candidates)]
+                endpoint = min(rotated, key=lambda e: e.outstanding)
+            else:
+                endpoint = min(candidates, key=lambda e: e.ewma * (e.outstanding + 1))
+
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, elapsed, ok=True):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if endpoint.ewma:
+                endpoint.ewma += self.decay * (elapsed - endpoint.ewma)
+            else:
+                endpoint.ewma = elapsed
+
+            if ok:
+                endpoint.failures = 0
+                endpoint.ejected_until = None
+            else:
+                endpoint.failures += 1
+                if endpoint.failures >= self.max_failures:
+                    endpoint.ejected_until = time.time() + self.eject_time
+
+    def check_health(self):
+        """
+        Runs health_check against every endpoint, ejecting the ones that
+        fail and bringing back the ones that pass.
+        """
+        if self.health_check is None:
+            return
+
+        for endpoint in self.endpoints:
+            healthy = self.health_check(endpoint.url)
+            with self._lock:
+                if healthy:
+                    endpoint.failures = 0
+                    endpoint.ejected_until = None
+                else:
+                    endpoint.failures = max(endpoint.failures, self.max_failures)
+                    endpoint.ejected_until = time.time() + self.eject_time
+
+    def rewrite(self, url, endpoint):
+        """
+        Returns url, built against the first base url, pointed at endpoint.
+        """
+        rest = url[len(self.base_url):]
+        if url.startswith(self.base_url) and (not rest or rest[0] in "/?#"):
+            return endpoint.url + rest
+        return url
+
+    def snapshot(self):
+        with self._lock:
+            return dict((e.url, e.snapshot()) for e in self.endpoints)
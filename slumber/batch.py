@@ -0,0 +1,187 @@
+import threading
+import time
+
+try:
+    from urllib.parse import quote, urlencode
+except ImportError:
+    from urllib import quote, urlencode
+
+from . import exceptions
+from .utils import copy_kwargs, paginate
+
+__all__ = ["get_many", "chunk_ids", "ManyResult", "BatchLoader", "STYLES"]
+
+# "in" asks the collection for ``?id__in=1,2,3``, "set" uses the Tastypie
+# ``set/1;2;3/`` endpoint.
+STYLES = ("in", "set")
+
+_SEPARATORS = {"in": ",", "set": ";"}
+
+
+class ManyResult(list):
+    """
+    The objects fetched by ``get_many``, in the order of the requested ids,
+    with None in place of the ids listed in ``missing``.
+    """
+
+    def __init__(self, objects, missing):
+        super(ManyResult, self).__init__(objects)
+        self.missing = missing
+
+
+def chunk_ids(ids, budget, separator_length=1):
+    """
+    Helper to split ids into lists whose url encoded, separated form fits
+    into budget characters. Every chunk has at least one id.
+    """
+    chunk, used = [], 0
+    for res_id in ids:
+        length = len(quote("%s" % res_id, safe=""))
+        if chunk and used + separator_length + length > budget:
+            yield chunk
+            chunk, used = [], 0
+        used += length + (separator_length if chunk else 0)
+        chunk.append(res_id)
+    if chunk:
+        yield chunk
+
+
+def _objects(data):
+    if isinstance(data, dict):
+        return data.get("objects", [])
+    return data or []
+
+
+def _id_of(obj, id_field):
+    value = obj[id_field] if isinstance(obj, dict) else getattr(obj, id_field)
+    return "%s" % value
+
+
+def get_many(resource, ids, style="in", param="id__in", id_field="id", max_url_length=2000, max_workers=None,
+             **kwargs):
+    """
+    Fetches the objects of the collection resource with the given ids in as
+    few requests as the url length allows, sent concurrently, and returns
+    a ManyResult. kwargs are sent as query parameters with every request.
+
+    max_workers defaults to the highest limit of the API's limiter, which
+    then decides how many requests are actually in flight, and to 4 without
+    a limiter.
+    """
+    if style not in STYLES:
+        raise exceptions.ImproperlyConfigured("%s is not a valid get_many style" % style)
+
+    distinct = []
+    seen = set()
+    for res_id in ids:
+        key = "%s" % res_id
+        if key not in seen:
+            seen.add(key)
+            distinct.append(res_id)
+
+    budget = max_url_length - len(resource.url()) - len(urlencode(sorted(kwargs.items()), doseq=True)) - 1
+    if style == "in":
+        budget -= len(param) + 2
+        separator_length = len(quote(_SEPARATORS[style], safe=""))
+    else:
+        budget -= len("set//")
+        separator_length = 1
+
+    def fetch(chunk):
+        joined = _SEPARATORS[style].join("%s" % res_id for res_id in chunk)
+        # A resource per request, chunks are fetched from several threads
+        target = resource._get_resource(**copy_kwargs(resource._store))
+        query = dict(kwargs)
+        if style == "in":
+            query[param] = joined
+        else:
+            target = target.set(joined)
+
+        # The objects of a chunk can span several pages
+        objects = []
+        while query is not None:
+            page, query = paginate(target.get(_lazy=False, _result=False, **query))
+            objects.extend(_objects(page))
+        return objects
+
+    if max_workers is None:
+        limiter = resource._store.get("limiter")
+        max_workers = limiter.max_limit if limiter is not None else 4
+
+    chunks = list(chunk_ids(distinct, max(budget, 1), separator_length))
+    if len(chunks) <= 1 or max_workers <= 1:
+        pages = [fetch(chunk) for chunk in chunks]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            pages = list(executor.map(fetch, chunks))
+
+    found = {}
+    for page in pages:
+        for obj in page:
+            found[_id_of(obj, id_field)] = obj
+
+    objects = [found.get("%s" % res_id) for res_id in ids]
+    missing = [res_id for res_id in distinct if "%s" % res_id not in found]
+    return ManyResult(objects, missing)
+
+
+class _Batch(object):
+
+    def __init__(self):
+        self.ids = []
+        self.closed = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchLoader(object):
+    """
+    Collapses ``get`` calls for single objects made from several threads
+    within window seconds of each other into one ``get_many``, of at most
+    max_batch ids. options are passed on to ``get_many``.
+    """
+
+    def __init__(self, resource, window=0.002, max_batch=100, **options):
+        self.resource = resource
+        self.window = window
+        self.max_batch = max_batch
+        self.options = options
+        self._lock = threading.Lock()
+        self._batch = None
+
+    def get(self, res_id):
+        """
+        Returns the object with res_id, raising HttpNotFoundError if the
+        collection doesn't have it.
+        """
+        with self._lock:
+            batch = self._batch
+            leader = batch is None or batch.closed or len(batch.ids) >= self.max_batch
+            if leader:
+                batch = self._batch = _Batch()
+            batch.ids.append(res_id)
+
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                batch.closed = True
+                if self._batch is batch:
+                    self._batch = None
+            try:
+                result = get_many(self.resource, batch.ids, **self.options)
+                batch.result = dict(("%s" % i, obj) for i, obj in zip(batch.ids, result) if obj is not None)
+            except Exception as exc:
+                batch.error = exc
+            batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        try:
+            return batch.result["%s" % res_id]
+        except KeyError:
+            raise exceptions.HttpNotFoundError("%s was not found in %s" % (res_id, self.resource.url()))
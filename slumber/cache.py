@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+__all__ = ["ObjectCache"]
+
+
+class ObjectCache(object):
+    """
+    An in process read-through cache of ``GET`` responses keyed by resource
+    path and query. Entries live for ttl seconds, or less if the response's
+    Cache-Control says so; once there are more than
+    max_entries of them, or their bodies take more than max_bytes, the
+    least recently used ones are evicted.
+
+    A write (``POST``, ``PUT``, ``PATCH``, ``DELETE``) to a path invalidates
+    the entries of that path and of its parent collection, so
+    ``api.users(5).put(...)`` drops both ``users/5/`` and ``users/``.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024, max_bytes=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        return url.split("?", 1)[0].rstrip("/")
+
+    def _key(self, url, params):
+        if not params:
+            return url
+        return "%s?%s" % (url, urlencode(sorted(params.items()), doseq=True))
+
+    def get(self, url, params=None):
+        """
+        Returns (status_code, content_type, content) for a cached response,
+        or None.
+        """
+        key = self._key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def set(self, url, params, status_code, content_type, content, ttl=None):
+        key = self._key(url, params)
+        size = len(content)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires = time.time() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires, status_code, content_type, content)
+            self._paths.setdefault(self._path(url), set()).add(key)
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and
+                                                             self.bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, url):
+        """
+        Drops the entries of the path of url and of its parent collection.
+        """
+        path = self._path(url)
+        with self._lock:
+            for prefix in (path, path.rsplit("/", 1)[0]):
+                for key in list(self._paths.get(prefix, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self.bytes = 0
+
+    def _move_to_end(self, key):
+        if hasattr(self._entries, "move_to_end"):
+            self._entries.move_to_end(key)
+        else:
+            self._entries[key] = self._entries.pop(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= len(entry[3])
+        path = self._path(key)
+        keys = self._paths[path]
+        keys.discard(key)
+        if not keys:
+            del self._paths[path]
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": float(self.hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+            }
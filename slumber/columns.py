@@ -0,0 +1,242 @@
+import array
+import json
+import re
+from itertools import islice
+from operator import itemgetter
+
+from . import exceptions
+from .utils import iterator
+
+__all__ = ["decode_columns", "KINDS"]
+
+# "columns" returns array.array for typed columns and lists for the others,
+# "numpy" returns numpy arrays.
+KINDS = ("columns", "numpy")
+
+# Bodies are decoded this many characters (about, rows aren't split) at a
+# time, so at most a chunk of row dicts is alive at once.
+CHUNK_SIZE = 1 << 16
+
+# Lines of a streamed ndjson response decoded at a time
+CHUNK_LINES = 1024
+
+_SPACES = " \t\n\r"
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Where one object of a list probably ends and the next starts
+_BOUNDARY = re.compile(r"\}[ \t\n\r]*,[ \t\n\r]*(?=\{)")
+_decoder = json.JSONDecoder()
+
+
+def _skip(text, pos):
+    if text[pos:pos + 1] in _SPACES:
+        return _WHITESPACE.match(text, pos).end()
+    return pos
+
+
+def _scan(text, pos, stop=None):
+    """
+    Decodes the values of a json list from pos on one at a time, up to the
+    first one ending after stop. Returns (values, pos, whether the list
+    ended).
+    """
+    scan_once = _decoder.scan_once
+    values = []
+    while True:
+        try:
+            value, pos = scan_once(text, pos)
+        except StopIteration as exc:
+            raise ValueError("Expecting value: char %d" % exc.args[0])
+        values.append(value)
+
+        pos = _skip(text, pos)
+        char = text[pos:pos + 1]
+        if char == "]":
+            return values, pos + 1, True
+        if char != ",":
+            raise ValueError("Expecting ',' delimiter: char %d" % pos)
+        pos = _skip(text, pos + 1)
+        if stop is not None and pos > stop:
+            return values, pos, False
+
+
+def _list_chunks(text, pos):
+    """
+    Yields the values of the json list starting before pos in chunks. A
+    chunk is cut at a guessed boundary between two objects and decoded in
+    one go; the guess can only be wrong by landing in a string or a nested
+    value, which makes the chunk invalid json, and then it is decoded value
+    by value instead.
+    """
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] == "]":
+        return
+
+    done = False
+    while not done:
+        boundary = _BOUNDARY.search(text, pos + CHUNK_SIZE)
+        if boundary is not None:
+            try:
+                chunk = _decoder.decode("[%s]" % text[pos:boundary.start() + 1])
+            except ValueError:
+                pass
+            else:
+                yield chunk
+                pos = boundary.end()
+                continue
+        chunk, pos, done = _scan(text, pos, boundary.start() if boundary is not None else None)
+        yield chunk
+
+
+def _chunks(text):
+    # A list of objects or a Tastypie page, decoded from its objects
+    pos = _skip(text, 0)
+    char = text[pos:pos + 1]
+    if char == "[":
+        return _list_chunks(text, pos + 1)
+
+    if char == "{":
+        pos = _skip(text, pos + 1)
+        while text[pos:pos + 1] == '"':
+            key, pos = _decoder.raw_decode(text, pos)
+            pos = _skip(text, pos)
+            if text[pos:pos + 1] != ":":
+                raise ValueError("Expecting ':' delimiter: char %d" % pos)
+            pos = _skip(text, pos + 1)
+            if key == "objects" and text[pos:pos + 1] == "[":
+                return _list_chunks(text, pos + 1)
+            pos = _skip(text, _decoder.raw_decode(text, pos)[1])
+            if text[pos:pos + 1] == ",":
+                pos = _skip(text, pos + 1)
+
+    raise exceptions.ImproperlyConfigured("Columns can only be decoded from a list of objects")
+
+
+def _ndjson_chunks(text):
+    # Newlines can't occur within a json value, so cutting at one is safe
+    pos = 0
+    while pos < len(text):
+        cut = text.find("\n", pos + CHUNK_SIZE)
+        if cut == -1:
+            cut = len(text)
+        lines = text[pos:cut].strip()
+        pos = cut + 1
+        if not lines:
+            continue
+        try:
+            yield _decoder.decode("[%s]" % lines.replace("\n", ","))
+        except ValueError:
+            # Blank lines
+            yield [_decoder.decode(line) for line in lines.split("\n") if line.strip()]
+
+
+def _line_chunks(lines):
+    lines = iter(lines)
+    chunk = list(islice(lines, CHUNK_LINES))
+    while chunk:
+        chunk = [_text(line) for line in chunk if line.strip()]
+        if chunk:
+            yield _decoder.decode("[%s]" % ",".join(chunk))
+        chunk = list(islice(lines, CHUNK_LINES))
+
+
+def _text(content):
+    if isinstance(content, memoryview):
+        content = content.tobytes()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    return content
+
+
+def _schema(columns):
+    if isinstance(columns, dict):
+        return list(iterator(columns))
+    return [column if isinstance(column, tuple) else (column, None) for column in columns]
+
+
+class _Columns(object):
+
+    def __init__(self, schema):
+        self.names = [name for name, _ in schema]
+        self.typecodes = [typecode for _, typecode in schema]
+        self.columns = [array.array(typecode) if typecode else [] for typecode in self.typecodes]
+
+    def extend(self, rows):
+        try:
+            for name, column in zip(self.names, self.columns):
+                size = len(column)
+                try:
+                    column.extend(map(itemgetter(name), rows))
+                except (KeyError, TypeError):
+                    # A missing or null value; extend keeps the values before it
+                    del column[size:]
+                    values = [row.get(name) for row in rows]
+                    if isinstance(column, array.array):
+                        values = self._fill(name, column.typecode, values)
+                    column.extend(values)
+        except AttributeError:
+            raise exceptions.ImproperlyConfigured("Columns can only be decoded from a list of objects")
+
+    def _fill(self, name, typecode, values):
+        for value in values:
+            if value is not None:
+                yield value
+            elif typecode in "fd":
+                yield float("nan")
+            else:
+                raise ValueError("Column %s has a null value, which only float or untyped columns can hold" % name)
+
+    def result(self, kind):
+        if kind == "numpy":
+            try:
+                import numpy
+            except ImportError:
+                raise exceptions.ImproperlyConfigured("_as='numpy' requires numpy")
+
+            columns = []
+            for column, typecode in zip(self.columns, self.typecodes):
+                if typecode:
+                    # Shares the memory of the array instead of copying it
+                    columns.append(numpy.frombuffer(column, dtype=typecode) if len(column) else
+                                   numpy.array([], dtype=typecode))
+                else:
+                    array_ = numpy.empty(len(column), dtype=object)
+                    array_[:] = column
+                    columns.append(array_)
+        else:
+            columns = self.columns
+        return dict(zip(self.names, columns))
+
+
+def decode_columns(schema, kind="columns", content=None, lines=None, data=None, ndjson=False):
+    """
+    Builds columns from a json body (content), ndjson (content with
+    ndjson, or an iterable of lines) or already decoded data. schema maps
+    column names to array typecodes (e.g. ``"q"`` for 64 bit integers,
+    ``"d"`` for floats) or None for arbitrary values; a list of names
+    declares untyped columns only.
+
+    The body is decoded and copied into the columns a chunk of rows at a
+    time, so only the body and the columns are alive at once rather than a
+    dict for every row. A Tastypie response is decoded from its ``objects``.
+    """
+    if kind not in KINDS:
+        raise exceptions.ImproperlyConfigured("%s is not a valid columns kind" % kind)
+
+    columns = _Columns(_schema(schema))
+
+    if lines is not None:
+        chunks = _line_chunks(lines)
+    elif content is not None:
+        text = _text(content)
+        chunks = _ndjson_chunks(text) if ndjson else _chunks(text)
+    else:
+        if isinstance(data, dict):
+            data = data.get("objects")
+        if not isinstance(data, list):
+            raise exceptions.ImproperlyConfigured("Columns can only be decoded from a list of objects")
+        chunks = [data]
+
+    for chunk in chunks:
+        columns.extend(chunk)
+
+    return columns.result(kind)
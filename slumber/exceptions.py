@@ -7,16 +7,38 @@ class SlumberBaseException(Exception):
     """
 
 
+# Statuses worth retrying later: the server didn't process the request.
+RETRYABLE_STATUS_CODES = (408, 429, 502, 503, 504)
+
+
 class SlumberHttpBaseException(SlumberBaseException):
     """
     All Slumber HTTP Exceptions inherit from this exception.
+
+    ``content`` is only read from the response when it is accessed.
     """
 
+    response = None
+
     def __init__(self, *args, **kwargs):
         for key, value in iterator(kwargs):
             setattr(self, key, value)
         super(SlumberHttpBaseException, self).__init__(*args)
 
+    @property
+    def content(self):
+        if "_content" not in self.__dict__:
+            self._content = self.response.content if self.response is not None else None
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    @property
+    def retryable(self):
+        return self.response is not None and self.response.status_code in RETRYABLE_STATUS_CODES
+
 
 class HttpClientError(SlumberHttpBaseException):
     """
@@ -52,3 +74,172 @@ class ImproperlyConfigured(SlumberBaseException):
     """
     Slumber is somehow improperly configured.
     """
+
+
+class RecordingNotFound(SlumberBaseException):
+    """
+    A replayed request has no matching recording.
+    """
+
+
+class TransportError(SlumberBaseException):
+    """
+    A request failed without an HTTP response. Raised instances are also
+    instances of the original ``requests`` exception, available as
+    ``original``.
+
+    ``request_sent`` tells whether the request may have reached the server;
+    ``retryable`` whether sending it again is safe and likely to help.
+    """
+
+    request_sent = True
+    retryable = False
+
+
+class ConnectError(TransportError):
+    """
+    No connection could be made; the request was never sent.
+    """
+
+    request_sent = False
+    retryable = True
+
+
+class ConnectTimeout(ConnectError):
+    """
+    Connecting to the server timed out.
+    """
+
+
+class DNSError(ConnectError):
+    """
+    The host name could not be resolved. Not retryable, an immediate retry
+    would fail the same way.
+    """
+
+    retryable = False
+
+
+class TLSError(ConnectError):
+    """
+    The TLS handshake or certificate verification failed. Not retryable.
+    """
+
+    retryable = False
+
+
+class PoolExhausted(TransportError):
+    """
+    No connection of the (blocking) connection pool became available.
+    """
+
+    request_sent = False
+    retryable = True
+
+
+class ReadError(TransportError):
+    """
+    The connection failed after the request was sent. Only retryable for
+    idempotent requests.
+    """
+
+
+class ReadTimeout(ReadError):
+    """
+    The server didn't answer in time after the request was sent.
+    """
+
+
+_RESOLUTION_ERRORS = ("name or service not known", "nodename nor servname", "getaddrinfo failed",
+                      "temporary failure in name resolution", "failed to resolve", "no address associated")
+
+_COMBINED = {}
+
+
+def transport_exceptions():
+    """
+    Returns the exceptions the transport raises for failed requests.
+    """
+    import requests
+    from urllib3.exceptions import PoolError
+
+    return (requests.RequestException, PoolError)
+
+
+def classify(exc):
+    """
+    Returns the TransportError subclass describing a ``requests`` (or
+    urllib3 pool) exception, without building an exception.
+    """
+    import requests
+    from urllib3.exceptions import MaxRetryError, NewConnectionError, PoolError
+
+    if isinstance(exc, TransportError):
+        return type(exc)
+    if isinstance(exc, PoolError):
+        return PoolExhausted
+    if isinstance(exc, requests.ConnectTimeout):
+        return ConnectTimeout
+    if isinstance(exc, requests.Timeout):
+        return ReadTimeout
+    if isinstance(exc, requests.exceptions.SSLError):
+        return TLSError
+    if isinstance(exc, requests.exceptions.ProxyError):
+        return ConnectError
+    if isinstance(exc, requests.exceptions.ChunkedEncodingError):
+        return ReadError
+    if not isinstance(exc, requests.ConnectionError):
+        return TransportError
+
+    reason = exc.args[0] if exc.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    if isinstance(reason, PoolError):
+        return PoolExhausted
+    if isinstance(reason, NewConnectionError):
+        if type(reason).__name__ == "NameResolutionError" or any(
+                message in ("%s" % reason).lower() for message in _RESOLUTION_ERRORS):
+            return DNSError
+        return ConnectError
+    # Anything else (typically the connection dropping while waiting for the
+    # response) may have happened after the request reached the server.
+    return ReadError
+
+
+def transport_error(exc, idempotent=False):
+    """
+    Returns the TransportError for a ``requests`` (or urllib3 pool)
+    exception, an instance of both the slumber class and the class of exc.
+    A ReadError is retryable if the request was idempotent.
+    """
+    cls = classify(exc)
+    if isinstance(exc, TransportError):
+        return exc
+
+    error = _rebuild(cls, type(exc), exc.args, getattr(exc, "__dict__", {}))
+    error.original = exc
+    error.__cause__ = exc
+    if issubclass(cls, ReadError):
+        error.retryable = idempotent
+    return error
+
+
+def _combine(cls, transport_class):
+    key = (cls, transport_class)
+    combined = _COMBINED.get(key)
+    if combined is None:
+        # Not importable under its name, so instances pickle through _rebuild
+        combined = _COMBINED[key] = type(cls.__name__, (cls, transport_class), {
+            "__module__": cls.__module__,
+            "__qualname__": "%s(%s.%s)" % (cls.__name__, transport_class.__module__, transport_class.__name__),
+            "__reduce__": lambda self: (_rebuild, (cls, transport_class, self.args, self.__dict__)),
+        })
+    return combined
+
+
+def _rebuild(cls, transport_class, args, state):
+    combined = _combine(cls, transport_class)
+    error = combined.__new__(combined, *args)
+    error.args = args
+    error.__dict__.update(state)
+    return error
@@ -0,0 +1,200 @@
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from . import exceptions
+
+__all__ = ["HedgePolicy"]
+
+
+class _Workers(object):
+    """
+    Runs calls on threads which are started as needed and reused while idle
+    for up to idle_timeout seconds. Unlike a fixed size pool, a call never
+    waits for a busy worker, so it doesn't cap how many requests are sent at
+    once or eat into the hedge delay.
+    """
+
+    def __init__(self, idle_timeout=30):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._tasks = queue.Queue()
+        self._idle = 0
+
+    def submit(self, fn):
+        from concurrent.futures import Future
+
+        future = Future()
+        with self._lock:
+            start = self._idle == 0
+            if not start:
+                self._idle -= 1
+        self._tasks.put((future, fn))
+        if start:
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            try:
+                future, fn = self._tasks.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # Unless every idle worker was just handed a task, which
+                    # may be this one's, there is one too many
+                    if self._idle > 0:
+                        self._idle -= 1
+                        return
+                continue
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                except BaseException as exc:
+                    future.set_exception(exc)
+            del future, fn
+            with self._lock:
+                self._idle += 1
+
+
+class HedgePolicy(object):
+    """
+    Sends a second copy of a GET that hasn't answered within delay seconds
+    and uses whichever copy succeeds first.
+
+    If delay is None it is the percentile latency recorded for the url
+    template in the API metrics, once at least min_samples requests were
+    seen (until then requests are not hedged). At most max_ratio of all
+    requests are hedged, and at most max_hedges hedges are in flight at
+    once, so a slow upstream doesn't get twice the load.
+
+    Attempts run on threads which are started as needed, so hedged requests
+    are never queued behind each other.
+
+    ``snapshot()`` reports how many hedges were sent, how many of them won
+    and how many were wasted because the original answered first.
+    """
+
+    def __init__(self, delay=None, percentile=95, max_ratio=0.1, min_samples=20, max_hedges=16):
+        self.delay = delay
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.wasted = 0
+
+    def _after_fork(self):
+        # Worker threads don't survive a fork
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    try:
+                        import concurrent.futures  # noqa: F401
+                    except ImportError:
+                        raise exceptions.ImproperlyConfigured("Hedging requires concurrent.futures")
+                    self._executor = _Workers()
+        return self._executor
+
+    def get_delay(self, histogram):
+        if self.delay is not None:
+            return self.delay
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        return histogram.percentile(self.percentile)
+
+    def _room(self):
+        return self.hedged + 1 <= self.max_ratio * self.requests and self._in_flight < self.max_hedges
+
+    def _allow(self):
+        with self._lock:
+            if not self._room():
+                return False
+            self.hedged += 1
+            self._in_flight += 1
+            return True
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def run(self, send, delay):
+        """
+        Calls send (which performs one attempt and returns a response),
+        hedging it after delay seconds if the policy allows it.
+        """
+        from concurrent.futures import wait, FIRST_COMPLETED
+
+        self._record("requests")
+        if delay is None or not self._room():
+            # Nothing to wait for, send on the calling thread
+            return send()
+
+        primary = self.executor.submit(send)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._allow():
+            return primary.result()
+
+        hedge = self.executor.submit(send)
+        hedge.add_done_callback(self._release)
+        pending = set([primary, hedge])
+        fallback = None
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    resp = future.result()
+                except Exception as exc:
+                    error = exc
+                    continue
+
+                if resp.status_code >= 500:
+                    fallback = resp
+                    continue
+
+                self._record("won" if future is hedge else "wasted")
+                for other in pending:
+                    # Requests can't be interrupted once sent; drop the late
+                    # response as soon as it arrives.
+                    if not other.cancel():
+                        other.add_done_callback(_close_response)
+                return resp
+
+        if fallback is not None:
+            return fallback
+        raise error
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "won": self.won,
+                "wasted": self.wasted,
+            }
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
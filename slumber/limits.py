@@ -0,0 +1,234 @@
+import itertools
+import math
+import threading
+from contextlib import contextmanager
+
+from . import exceptions
+from .metrics import Histogram, clock
+
+__all__ = ["ConcurrencyLimiter", "AIMDLimit", "GradientLimit", "PRIORITIES"]
+
+PRIORITIES = ("interactive", "default", "bulk")
+
+# Responses which tell us the upstream is overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
+
+# Latencies are counted as at least this many seconds, so a coarse clock (or
+# a request answered instantly) can't make a ratio of latencies infinite.
+MIN_RTT = 0.001
+
+
+class AIMDLimit(object):
+    """
+    An adaptive concurrency limit which grows by one for every request that
+    completes normally while the limit is in use, and is cut by backoff when
+    a request is rejected (429/503, transport error) or takes more than
+    tolerance times the lowest latency seen.
+    """
+
+    def __init__(self, initial=10, min_limit=1, max_limit=200, backoff=0.9, tolerance=2.0):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.min_rtt = None
+
+    def update(self, rtt, in_flight, dropped=False):
+        rtt = max(rtt, MIN_RTT)
+        if not dropped and (self.min_rtt is None or rtt < self.min_rtt):
+            self.min_rtt = rtt
+
+        if dropped or rtt > self.tolerance * self.min_rtt:
+            self.limit = max(self.min_limit, int(self.limit * self.backoff))
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+class GradientLimit(object):
+    """
+    An adaptive concurrency limit driven by the ratio between the long term
+    and the short term average latency: it grows while latency stays flat
+    and shrinks in proportion when latency rises, and is halved when a
+    request is rejected (429/503, transport error).
+    """
+
+    def __init__(self, initial=10, min_limit=1, max_limit=200, smoothing=0.2, tolerance=1.5,
+                 long_window=600, short_window=10):
+        self.estimate = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self._long_decay = 2.0 / (long_window + 1)
+        self._short_decay = 2.0 / (short_window + 1)
+        self.long_rtt = None
+        self.short_rtt = None
+
+    def update(self, rtt, in_flight, dropped=False):
+        if dropped:
+            gradient = 0.5
+        else:
+            rtt = max(rtt, MIN_RTT)
+            if self.long_rtt is None:
+                self.long_rtt = self.short_rtt = rtt
+            self.long_rtt += self._long_decay * (rtt - self.long_rtt)
+            self.short_rtt += self._short_decay * (rtt - self.short_rtt)
+            gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / self.short_rtt))
+
+        if in_flight * 2 < self.limit and gradient >= 1.0:
+            # Not enough load to learn anything about a higher limit
+            return
+
+        new_limit = self.estimate * gradient + math.sqrt(self.estimate)
+        new_limit = self.estimate * (1 - self.smoothing) + new_limit * self.smoothing
+        self.estimate = max(self.min_limit, min(self.max_limit, new_limit))
+
+    @property
+    def limit(self):
+        return int(self.estimate)
+
+
+class _Waiter(object):
+
+    __slots__ = ("ticket", "host")
+
+    def __init__(self, ticket, host):
+        self.ticket = ticket
+        self.host = host
+
+
+class ConcurrencyLimiter(object):
+    """
+    Caps the number of requests in flight, overall (max_in_flight) and per
+    host (per_host). Requests over the cap queue up and are let through by
+    priority, earlier priorities in the priorities tuple first and in
+    arrival order within a priority.
+
+    max_in_flight is either a number or an adaptive limit (AIMDLimit,
+    GradientLimit) which is updated with the latency and outcome of every
+    request.
+
+    ``snapshot()`` reports the requests in flight, the current and maximum
+    queue depth and the time spent waiting per priority.
+    """
+
+    def __init__(self, max_in_flight=10, per_host=None, priorities=PRIORITIES, default="default"):
+        if default not in priorities:
+            raise exceptions.ImproperlyConfigured("%s is not one of the priorities" % default)
+
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.priorities = dict((name, rank) for rank, name in enumerate(priorities))
+        self.default = default
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self._hosts = {}
+        self._waiting = []
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._wait_times = dict((name, Histogram()) for name in priorities)
+
+    def _after_fork(self):
+        # Requests in flight in the parent don't exist in the child
+        self.in_flight = 0
+        self._hosts = {}
+        self._waiting = []
+        self._cond = threading.Condition()
+
+    def _rank(self, priority):
+        try:
+            return self.priorities[priority]
+        except KeyError:
+            raise exceptions.ImproperlyConfigured("%s is not a valid priority" % priority)
+
+    @property
+    def limit(self):
+        if isinstance(self.max_in_flight, int):
+            return self.max_in_flight
+        return self.max_in_flight.limit
+
+    @property
+    def max_limit(self):
+        """
+        The highest the limit can get, for sizing thread pools which send
+        their requests through the limiter.
+        """
+        if isinstance(self.max_in_flight, int):
+            return self.max_in_flight
+        return getattr(self.max_in_flight, "max_limit", self.limit)
+
+    def _has_capacity(self, host):
+        if self.in_flight >= self.limit:
+            return False
+        return self.per_host is None or self._hosts.get(host, 0) < self.per_host
+
+    def _next(self):
+        # The first waiter, by priority and arrival, that could run right now
+        eligible = [w for w in self._waiting if self._has_capacity(w.host)]
+        return min(eligible, key=lambda w: w.ticket) if eligible else None
+
+    def acquire(self, priority=None, host=None):
+        priority = priority or self.default
+        waiter = _Waiter((self._rank(priority), next(self._counter)), host)
+        start = clock()
+
+        with self._cond:
+            self._waiting.append(waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+            while self._next() is not waiter:
+                self._cond.wait()
+
+            self._waiting.remove(waiter)
+            self.in_flight += 1
+            self._hosts[host] = self._hosts.get(host, 0) + 1
+            self._wait_times[priority].record(clock() - start)
+            if self._waiting:
+                self._cond.notify_all()
+
+    def release(self, host=None, rtt=None, dropped=False):
+        with self._cond:
+            # Free the slot first, a failing limit must not leak it
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            self._hosts[host] -= 1
+            if not self._hosts[host]:
+                del self._hosts[host]
+            try:
+                if rtt is not None and not isinstance(self.max_in_flight, int):
+                    self.max_in_flight.update(rtt, in_flight, dropped)
+            finally:
+                self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority=None, host=None):
+        self.acquire(priority, host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def call(self, send, priority=None, host=None):
+        """
+        Calls send within a slot and feeds its latency and outcome to an
+        adaptive limit.
+        """
+        self.acquire(priority, host)
+        start = clock()
+        dropped = True
+        try:
+            resp = send()
+            dropped = resp.status_code in OVERLOAD_STATUS_CODES
+            return resp
+        finally:
+            self.release(host, clock() - start, dropped)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiting),
+                "max_queue_depth": self.max_queue_depth,
+                "wait_time": dict((name, histogram.snapshot()) for name, histogram in self._wait_times.items()),
+            }
@@ -0,0 +1,169 @@
+import re
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from .utils import iterator
+
+__all__ = ["Histogram", "MetricsRegistry", "normalize_path", "get_registry"]
+
+clock = getattr(time, "perf_counter", time.time)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12})$")
+
+
+def normalize_path(url):
+    """
+    Helper to turn a url into a template by replacing numeric and uuid path
+    segments with ``{id}``. Used for resources that don't carry a template.
+    """
+    path = urlsplit(url).path
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def get_registry(api):
+    """
+    Returns the MetricsRegistry of api (or of one of its resources), or None
+    if it was created with ``metrics=False``. It isn't an attribute of the
+    API, where it would hide a resource called metrics.
+    """
+    return api._store["metrics"]
+
+
+class Histogram(object):
+    """
+    A log-linear histogram in the style of HdrHistogram. Values are recorded in
+    microseconds; every bucket is within 1/64 (~1.5%) of the values it holds, so
+    memory stays small no matter how many samples are recorded.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        shift = value.bit_length() - self.SUB_BUCKET_BITS
+        if shift <= 0:
+            return value, value
+        top = value >> shift
+        return (shift << self.SUB_BUCKET_BITS) + top, top << shift
+
+    def record(self, seconds):
+        value = int(seconds * 1000000)
+        index, _ = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _bucket_value(self, index):
+        shift = index >> self.SUB_BUCKET_BITS
+        if shift == 0:
+            return index
+        return (index - (shift << self.SUB_BUCKET_BITS)) << shift
+
+    def percentile(self, percentile):
+        """
+        Returns the value (in seconds) at or below which percentile percent
+        of the recorded values fall, or None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+
+        threshold = self.count * percentile / 100.0
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._bucket_value(index), self.max) / 1000000.0
+        return self.max / 1000000.0
+
+    def snapshot(self):
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "min": self.min / 1000000.0,
+            "max": self.max / 1000000.0,
+            "mean": self.total / float(self.count) / 1000000.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+
+class _Entry(object):
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = Histogram()
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class MetricsRegistry(object):
+    """
+    Per API request metrics, keyed by method and url template (for example
+    ``GET /api/v1/users/{id}/``). Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _after_fork(self):
+        # A child reports its own requests, not a copy of the parent's
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, method, template, elapsed, error=None, bytes_in=0, bytes_out=0):
+        key = "%s %s" % (method, template)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.requests += 1
+            entry.bytes_in += bytes_in
+            entry.bytes_out += bytes_out
+            entry.latency.record(elapsed)
+            if error is not None:
+                entry.errors[error] = entry.errors.get(error, 0) + 1
+
+    def histogram(self, method, template):
+        """
+        Returns the latency Histogram for method and template, or None.
+        """
+        entry = self._entries.get("%s %s" % (method, template))
+        return entry.latency if entry is not None else None
+
+    def snapshot(self):
+        with self._lock:
+            return dict((key, entry.snapshot()) for key, entry in iterator(self._entries))
+
+    def reset(self):
+        with self._lock:
+            self._entries = {}
@@ -0,0 +1,261 @@
+import os
+import struct
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from . import exceptions
+
+__all__ = ["register_fork_handler", "check_fork", "reset_session", "SharedCache", "cache_ttl", "credentials_key",
+           "is_conditional"]
+
+_HANDLERS = weakref.WeakKeyDictionary()
+_PID = os.getpid()
+
+
+def reset_session(session):
+    """
+    Drops the connection pools of session without closing their sockets,
+    which still belong to the parent process after a fork.
+    """
+    adapters = getattr(session, "adapters", None)
+    if not isinstance(adapters, dict):
+        return
+
+    for adapter in adapters.values():
+        if hasattr(adapter, "init_poolmanager"):
+            adapter.init_poolmanager(adapter._pool_connections, adapter._pool_maxsize, block=adapter._pool_block)
+            adapter.proxy_manager = {}
+
+
+def register_fork_handler(obj, handler):
+    """
+    Calls handler(obj) in a child process after a fork, for as long as obj is
+    alive. Used to give every worker of a pre-fork server its own sessions.
+    """
+    _HANDLERS[obj] = handler
+
+
+def _after_fork():
+    global _PID
+    _PID = os.getpid()
+    for obj, handler in list(_HANDLERS.items()):
+        handler(obj)
+
+
+def check_fork():
+    """
+    Runs the fork handlers if the process was forked since the last check.
+    Only does any work where ``os.register_at_fork`` is not available.
+    """
+    if _PID != os.getpid():
+        _after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+_CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie")
+
+
+def cache_ttl(headers, ttl):
+    """
+    Helper returning for how many seconds, at most ttl, a response with
+    headers may be kept in a shared cache according to its Cache-Control,
+    or None if it must not be stored (``no-store``, ``no-cache``,
+    ``private`` or a zero ``max-age``).
+    """
+    value = ""
+    for name, header in headers.items():
+        if name.lower() == "cache-control":
+            value = header
+
+    directives = {}
+    for directive in value.split(","):
+        name, _, argument = directive.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"')
+
+    if any(name in directives for name in ("no-store", "no-cache", "private")):
+        return None
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                age = int(directives[name])
+            except ValueError:
+                return None
+            return min(age, ttl) if age > 0 else None
+    return ttl
+
+
+# Request headers asking the server to compare against a version the client has
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range")
+
+
+def is_conditional(headers):
+    """
+    Helper returning whether request headers make a request conditional, so
+    it has to reach the server rather than be answered from a cache.
+    """
+    return bool(headers) and any(name.lower() in CONDITIONAL_HEADERS for name in headers)
+
+
+def credentials_key(session, headers=None):
+    """
+    Helper returning a digest of the credentials the requests of session are
+    sent with (its auth, cookies and authorization headers), or "" if there
+    are none, so a response cached for one caller isn't served to another.
+    """
+    parts = []
+    auth = getattr(session, "auth", None)
+    if auth is not None:
+        if not isinstance(auth, tuple):
+            try:
+                auth = (type(auth).__name__, sorted(vars(auth).items()))
+            except TypeError:
+                pass
+        parts.append(repr(auth))
+
+    for source in (getattr(session, "headers", None), headers):
+        if isinstance(source, Mapping):
+            for name, value in sorted(source.items()):
+                if name.lower() in _CREDENTIAL_HEADERS:
+                    parts.append("%s: %s" % (name.lower(), value))
+
+    cookies = getattr(session, "cookies", None)
+    if cookies is not None and hasattr(cookies, "__iter__"):
+        parts.extend(sorted("%s %s %s=%s" % (c.domain, c.path, c.name, c.value) for c in cookies))
+
+    if not parts:
+        return ""
+
+    import hashlib
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+# Slot layout: sha1 of the key, expiry timestamp, status, content type length,
+# body length, followed by the content type and body.
+_SLOT_HEADER = struct.Struct("<20sdHHI")
+
+
+class SharedCache(object):
+    """
+    A fixed size response cache in a memory mapped file, shared between every
+    process that opens the same path (e.g. the workers of a pre-fork server),
+    so reference data is only fetched once for all of them.
+
+    The file holds slots entries of at most slot_size bytes each; a key maps
+    to one slot and newer entries simply overwrite older ones. Entries expire
+    after ttl seconds. Access to a slot is guarded by an fcntl record lock
+    where available.
+    """
+
+    def __init__(self, path, slots=1024, slot_size=64 * 1024, ttl=60):
+        import mmap
+
+        if slot_size <= _SLOT_HEADER.size:
+            raise exceptions.ImproperlyConfigured("slot_size must be larger than %s" % _SLOT_HEADER.size)
+
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        size = slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._local = threading.Lock()
+        register_fork_handler(self, SharedCache._after_fork)
+
+    def _after_fork(self):
+        self._local = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _slot(self, key):
+        import hashlib
+
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        index = struct.unpack("<Q", digest[:8])[0] % self.slots
+        return digest, index * self.slot_size
+
+    def _lock(self, offset, exclusive):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, self.slot_size, offset)
+
+    def _unlock(self, offset):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+
+    def get(self, key):
+        """
+        Returns (status_code, content_type, content) for key, or None.
+        """
+        digest, offset = self._slot(key)
+        with self._local:
+            self._lock(offset, False)
+            try:
+                stored, expires, status, ctype_len, length = _SLOT_HEADER.unpack_from(self._map, offset)
+                if stored != digest or expires < time.time():
+                    self.misses += 1
+                    return None
+                start = offset + _SLOT_HEADER.size
+                content_type = self._map[start:start + ctype_len].decode("latin-1")
+                content = self._map[start + ctype_len:start + ctype_len + length]
+            finally:
+                self._unlock(offset)
+            self.hits += 1
+        return status, content_type, content
+
+    def set(self, key, status_code, content_type, content, ttl=None):
+        """
+        Stores a response under key. Returns False if it doesn't fit a slot.
+        """
+        content_type = (content_type or "").encode("latin-1")
+        if _SLOT_HEADER.size + len(content_type) + len(content) > self.slot_size:
+            return False
+
+        digest, offset = self._slot(key)
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        header = _SLOT_HEADER.pack(digest, expires, status_code, len(content_type), len(content))
+        start = offset + _SLOT_HEADER.size
+
+        with self._local:
+            self._lock(offset, True)
+            try:
+                self._map[offset:start] = header
+                self._map[start:start + len(content_type)] = content_type
+                self._map[start + len(content_type):start + len(content_type) + len(content)] = content
+            finally:
+                self._unlock(offset)
+        return True
+
+    def delete(self, key):
+        digest, offset = self._slot(key)
+        with self._local:
+            self._lock(offset, True)
+            try:
+                if _SLOT_HEADER.unpack_from(self._map, offset)[0] == digest:
+                    self._map[offset:offset + 20] = b"\0" * 20
+            finally:
+                self._unlock(offset)
+
+    def snapshot(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
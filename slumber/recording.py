@@ -0,0 +1,124 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import requests
+
+from . import exceptions
+from .response import make_response
+from .utils import request_key
+
+__all__ = ["RecordingSession", "ReplaySession", "request_key"]
+
+# Every record is a header followed by a json metadata blob and the raw body.
+_HEADER = struct.Struct("<II")
+
+
+class RecordingSession(requests.Session):
+    """
+    A requests Session that appends every request/response pair it makes to a
+    recording file which can later be served by a ReplaySession.
+    """
+
+    def __init__(self, path):
+        super(RecordingSession, self).__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        resp = super(RecordingSession, self).request(method, url, params=params, data=data, **kwargs)
+
+        meta = json.dumps({
+            "key": request_key(method, url, params, data),
+            "method": method.upper(),
+            "url": resp.url,
+            "status": resp.status_code,
+            "headers": dict(resp.headers),
+            "elapsed": resp.elapsed.total_seconds(),
+        }).encode("utf-8")
+        content = resp.content or b""
+
+        with self._lock:
+            self._file.write(_HEADER.pack(len(meta), len(content)))
+            self._file.write(meta)
+            self._file.write(content)
+            self._file.flush()
+
+        return resp
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        super(RecordingSession, self).close()
+
+
+class ReplaySession(requests.Session):
+    """
+    A requests Session that answers requests from a recording file instead of
+    the network. The file is memory mapped and indexed once when the session
+    is created; bodies are only read when they are replayed.
+
+    latency controls simulated latency: None replies immediately,
+    ``"recorded"`` waits as long as the original response took and a number
+    waits that many seconds. Requests recorded more than once are replayed
+    in order, starting over once all recordings were used.
+    """
+
+    def __init__(self, path, latency=None):
+        super(ReplaySession, self).__init__()
+        self.path = path
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._index = {}
+
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b""
+        self._build_index()
+
+    def _build_index(self):
+        offset = 0
+        size = len(self._map)
+        while offset + _HEADER.size <= size:
+            meta_len, content_len = _HEADER.unpack_from(self._map, offset)
+            meta_start = offset + _HEADER.size
+            content_start = meta_start + meta_len
+            meta = json.loads(self._map[meta_start:content_start].decode("utf-8"))
+            self._index.setdefault(meta["key"], []).append((meta, content_start, content_len))
+            offset = content_start + content_len
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        key = request_key(method, url, params, data)
+
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                raise exceptions.RecordingNotFound("No recording for %s %s" % (method.upper(), url))
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = (cursor + 1) % len(entries)
+            meta, start, length = entries[cursor]
+
+        if self.latency == "recorded":
+            time.sleep(meta["elapsed"])
+        elif self.latency:
+            time.sleep(self.latency)
+
+        return make_response(meta["status"], meta["headers"], self._map[start:start + length],
+                             url=meta["url"], elapsed=meta["elapsed"])
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+        super(ReplaySession, self).close()
@@ -0,0 +1,129 @@
+from . import exceptions
+
+__all__ = ["RecordDecoder", "get_decoder"]
+
+_DECODERS = {}
+
+
+def get_decoder(record_class):
+    """
+    Returns the (cached) RecordDecoder for record_class, so the class is only
+    inspected once no matter how many resources decode into it.
+    """
+    decoder = _DECODERS.get(record_class)
+    if decoder is None:
+        decoder = _DECODERS[record_class] = RecordDecoder(record_class)
+    return decoder
+
+
+def _slots(record_class):
+    slots = []
+    for klass in reversed(record_class.__mro__):
+        names = klass.__dict__.get("__slots__", ())
+        if isinstance(names, str):
+            names = (names,)
+        slots.extend(name for name in names if name not in ("__dict__", "__weakref__"))
+    return tuple(slots)
+
+
+def _namedtuple_defaults(record_class):
+    # What ``_make`` can't fill in: the defaults of __new__, which is where
+    # namedtuple(defaults=...) puts them too
+    values = getattr(record_class.__new__, "__defaults__", None) or ()
+    return dict(zip(record_class._fields[len(record_class._fields) - len(values):], values))
+
+
+def _required(function, fields):
+    # The fields which function (an __init__) has no default for
+    import inspect
+
+    try:
+        signature = inspect.signature(function)
+    except AttributeError:
+        spec = inspect.getargspec(function)
+        names = spec.args[1:len(spec.args) - len(spec.defaults or ())]
+    else:
+        kinds = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+        names = [p.name for p in list(signature.parameters.values())[1:]
+                 if p.kind in kinds and p.default is inspect.Parameter.empty]
+    return tuple(name for name in names if name in fields)
+
+
+class RecordDecoder(object):
+    """
+    Turns decoded dicts into instances of a record class. Supported record
+    classes are namedtuples, dataclasses and classes defining ``__slots__``.
+
+    Keys that are not fields of the record are dropped. Missing fields are
+    left to the record's defaults where it has any, and None otherwise.
+    """
+
+    def __init__(self, record_class):
+        self.record_class = record_class
+
+        self.defaults = {}
+        self.required = ()
+
+        if issubclass(record_class, tuple) and hasattr(record_class, "_fields"):
+            self.fields = tuple(record_class._fields)
+            self.defaults = _namedtuple_defaults(record_class)
+            self._build = self._build_namedtuple
+        elif hasattr(record_class, "__dataclass_fields__"):
+            import dataclasses
+            fields = [f for f in dataclasses.fields(record_class) if f.init]
+            self.fields = tuple(f.name for f in fields)
+            self.required = tuple(f.name for f in fields if f.default is dataclasses.MISSING and
+                                  f.default_factory is dataclasses.MISSING)
+            self._build = self._build_kwargs
+        elif _slots(record_class):
+            self.fields = _slots(record_class)
+            if record_class.__init__ is object.__init__:
+                self._build = self._build_slots
+            else:
+                self.required = _required(record_class.__init__, self.fields)
+                self._build = self._build_kwargs
+        else:
+            raise exceptions.ImproperlyConfigured(
+                "%s is not a namedtuple, dataclass or __slots__ class" % record_class.__name__)
+
+    def _build_namedtuple(self, obj):
+        defaults = self.defaults
+        return self.record_class._make([obj.get(name, defaults.get(name)) for name in self.fields])
+
+    def _build_kwargs(self, obj):
+        kwargs = dict((name, obj[name]) for name in self.fields if name in obj)
+        for name in self.required:
+            kwargs.setdefault(name, None)
+        return self.record_class(**kwargs)
+
+    def _build_slots(self, obj):
+        record = self.record_class.__new__(self.record_class)
+        for name in self.fields:
+            setattr(record, name, obj.get(name))
+        return record
+
+    def decode(self, obj):
+        if isinstance(obj, dict):
+            return self._build(obj)
+        return obj
+
+    def __call__(self, data):
+        """
+        Decodes a whole response payload: a single object, a list of objects,
+        a paginated ``{"meta": ..., "objects": [...]}`` envelope or an
+        iterator of objects (which is decoded lazily).
+        """
+        if isinstance(data, list):
+            return [self.decode(obj) for obj in data]
+
+        if isinstance(data, dict):
+            if isinstance(data.get("objects"), list):
+                envelope = dict(data)
+                envelope["objects"] = [self.decode(obj) for obj in data["objects"]]
+                return envelope
+            return self._build(data)
+
+        if hasattr(data, "__next__") or hasattr(data, "next"):
+            return (self.decode(obj) for obj in data)
+
+        return data
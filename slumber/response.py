@@ -0,0 +1,110 @@
+__all__ = ["LazyResponse", "Result", "make_response"]
+
+_MISSING = object()
+
+REQUEST_ID_HEADERS = ("x-request-id", "request-id", "x-correlation-id")
+
+
+def make_response(status_code, headers, content, url=None, elapsed=0):
+    """
+    Builds a ``requests.Response`` that didn't come from the network, e.g.
+    one served from a recording or a cache.
+    """
+    import datetime
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers = CaseInsensitiveDict(headers)
+    resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+    resp.url = url
+    resp.elapsed = datetime.timedelta(seconds=elapsed)
+    resp._content = content
+    return resp
+
+
+class LazyResponse(object):
+    """
+    A proxy for a response body which is only deserialized when it is first
+    accessed through ``data``, item access, iteration or ``len()``.
+
+    Until then the raw body is available as ``content``, which is the exact
+    object received from requests and not a copy. Once the body has been
+    deserialized the raw buffer is released and ``content`` becomes None.
+    """
+
+    def __init__(self, status_code, headers, content, loader):
+        self.status_code = status_code
+        self.headers = headers
+        self._content = content
+        self._loader = loader
+        self._data = _MISSING
+
+    @property
+    def content(self):
+        return self._content
+
+    @property
+    def loaded(self):
+        return self._data is not _MISSING
+
+    @property
+    def data(self):
+        if self._data is _MISSING:
+            self._data = self._loader(self._content)
+            self._content = None
+            self._loader = None
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, item):
+        return item in self.data
+
+    def __bool__(self):
+        return bool(self.data)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        if self.loaded:
+            return "<LazyResponse [%s] %r>" % (self.status_code, self._data)
+        return "<LazyResponse [%s] (not loaded)>" % self.status_code
+
+
+class Result(object):
+    """
+    The outcome of a single call, returned instead of the bare data when
+    result mode is on. It only holds what it needs and no reference to the
+    underlying ``requests.Response``.
+    """
+
+    __slots__ = ("data", "status_code", "headers", "elapsed", "request_id")
+
+    def __init__(self, data, status_code, headers, elapsed, request_id=None):
+        self.data = data
+        self.status_code = status_code
+        self.headers = headers
+        self.elapsed = elapsed
+        self.request_id = request_id
+
+    @classmethod
+    def from_response(cls, resp, data, elapsed):
+        headers = resp.headers
+        request_id = None
+        for name in REQUEST_ID_HEADERS:
+            request_id = headers.get(name) or headers.get(name.title())
+            if request_id is not None:
+                break
+        return cls(data, resp.status_code, headers, elapsed, request_id)
+
+    def __repr__(self):
+        return "<Result [%s] %r>" % (self.status_code, self.data)
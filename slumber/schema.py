@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+from . import exceptions
+from .utils import url_join, copy_kwargs, iterator
+
+__all__ = ["SchemaNode", "load_schema", "parse_schema", "compile_api"]
+
+_PARAM = re.compile(r"^\{(\w+)\}$")
+
+_HTTP_METHODS = ("get", "head", "options", "post", "put", "patch", "delete")
+
+
+class SchemaNode(object):
+    """
+    One path segment of a schema: the methods it allows, its named children
+    and, if it takes an id, the node for ``resource(id)``.
+    """
+
+    def __init__(self, name=None, param_name=None):
+        self.name = name
+        self.param_name = param_name
+        self.methods = set()
+        self.children = {}
+        self.param = None
+
+    def child(self, name):
+        if name not in self.children:
+            self.children[name] = SchemaNode(name)
+        return self.children[name]
+
+    def param_child(self, param_name):
+        if self.param is None:
+            self.param = SchemaNode(param_name=param_name)
+        return self.param
+
+    def add_path(self, path, methods):
+        node = self
+        for segment in [x for x in path.split("/") if x]:
+            match = _PARAM.match(segment)
+            node = node.param_child(match.group(1)) if match else node.child(segment)
+        node.methods.update(methods)
+        return node
+
+
+def load_schema(source, session=None, cache_dir=None, max_age=None):
+    """
+    Loads a json schema from a file or url. Schemas fetched from a url are
+    cached in cache_dir (if given) and reused until they are max_age seconds
+    old, or forever if max_age is None.
+    """
+    if os.path.exists(source):
+        with open(source) as fp:
+            return json.load(fp)
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, hashlib.sha1(source.encode("utf-8")).hexdigest() + ".json")
+        if os.path.exists(cache_path) and (max_age is None or time.time() - os.path.getmtime(cache_path) < max_age):
+            with open(cache_path) as fp:
+                return json.load(fp)
+
+    if session is None:
+        import requests
+        session = requests.session()
+
+    resp = session.request("GET", source, headers={"accept": "application/json"})
+    if not 200 <= resp.status_code <= 299:
+        raise exceptions.ImproperlyConfigured("Could not load schema %s (%s)" % (source, resp.status_code))
+    content = resp.content
+    schema = json.loads(content.decode("utf-8") if isinstance(content, bytes) else content)
+
+    if cache_path is not None:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_path = "%s.%s.tmp" % (cache_path, os.getpid())
+        with open(tmp_path, "w") as fp:
+            json.dump(schema, fp)
+        os.rename(tmp_path, cache_path)
+
+    return schema
+
+
+def schema_base_url(schema):
+    """
+    Returns the base url declared by an OpenAPI / Swagger schema, if any.
+    """
+    if schema.get("servers"):
+        return schema["servers"][0].get("url")
+    if schema.get("host"):
+        scheme = (schema.get("schemes") or ["https"])[0]
+        return "%s://%s%s" % (scheme, schema["host"], schema.get("basePath", "/"))
+    return None
+
+
+def parse_schema(schema):
+    """
+    Builds a SchemaNode tree from an OpenAPI / Swagger document (anything
+    with ``paths``) or a Tastypie top level schema.
+    """
+    root = SchemaNode()
+
+    if "paths" in schema:
+        for path, operations in iterator(schema["paths"]):
+            root.add_path(path, [x.upper() for x in operations if x in _HTTP_METHODS])
+        return root
+
+    all_methods = [x.upper() for x in _HTTP_METHODS]
+    for name, info in iterator(schema):
+        if not isinstance(info, dict) or "list_endpoint" not in info:
+            raise exceptions.ImproperlyConfigured("%s is not a Tastypie or OpenAPI schema" % name)
+        node = root.add_path(name, all_methods)
+        node.param_child("id").methods.update(all_methods)
+
+    return root
+
+
+def _child_property(name):
+    return property(lambda self: self._child(name))
+
+
+def compiled_method(name, spec):
+    if spec["has_data"]:
+        def method(self, data=None, files=None, **kwargs):
+            kwargs.update({"data": data, "files": files})
+            return self._perform_compiled(spec, kwargs)
+    else:
+        def method(self, **kwargs):
+            return self._perform_compiled(spec, kwargs)
+    method.__name__ = str(name)
+    return method
+
+
+class CompiledResourceMixin(object):
+    """
+    Behaviour shared by the API and Resource classes compiled from a schema.
+    Children are real properties and methods are real methods, so attribute
+    lookup never reaches ``ResourceAttributesMixin.__getattr__``, and names
+    that are not in the schema fail immediately.
+    """
+
+    _children = {}
+    _param_class = None
+
+    def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
+        raise AttributeError("%s has no resource or method %r" % (self._store["template"], item))
+
+    def _child(self, name):
+        kwargs = copy_kwargs(self._store)
+        kwargs.pop("collection_url", None)
+        kwargs["base_url"] = url_join(self._store["base_url"], name)
+        kwargs["template"] = url_join(self._store["template"], name)
+        return self._children[name](**kwargs)
+
+
+class CompiledResource(CompiledResourceMixin):
+
+    def _perform_compiled(self, spec, kwargs):
+        self._call = spec
+        try:
+            return self._perform_action(**kwargs)
+        finally:
+            self._call = None
+
+    def __call__(self, res_id=None, res_format=None, url_override=None, **kwargs):
+        if self._call or res_id is None:
+            return super(CompiledResource, self).__call__(res_id, res_format, url_override, **kwargs)
+
+        if self._param_class is None:
+            raise TypeError("%s does not take an id" % self._store["template"])
+
+        kwargs = copy_kwargs(self._store)
+        kwargs["base_url"] = url_join(self._store["base_url"], res_id)
+        kwargs["collection_url"] = self._store["base_url"]
+        kwargs["template"] = url_join(self._store["template"], "{%s}" % self._param_class._param_name)
+        if res_format is not None:
+            kwargs["format"] = res_format
+        return self._param_class(**kwargs)
+
+
+def _compile_resource(node, resource_class, name):
+    methods = dict((key, spec) for key, spec in iterator(resource_class._methods)
+                   if spec["method"] in node.methods)
+
+    attrs = {
+        "_methods": methods,
+        "_param_name": node.param_name,
+        "allowed_methods": tuple(sorted(spec["method"] for spec in methods.values())),
+    }
+    for key, spec in iterator(methods):
+        attrs[key] = compiled_method(key, spec)
+
+    class_name = "".join(x.title() for x in re.split(r"\W+|_", "%s" % name) if x) + "Resource"
+    return _compile_class(node, resource_class, (CompiledResource, resource_class), name, class_name, attrs)
+
+
+def _compile_class(node, resource_class, bases, name, class_name, attrs):
+    children = {}
+    for child_name, child in iterator(node.children):
+        children[child_name] = _compile_resource(child, resource_class, child_name)
+        # Children whose names clash with existing attributes (``url``,
+        # ``get``, ...) stay reachable through ``_child(name)``.
+        if child_name not in attrs and not any(child_name in base.__dict__
+                                               for klass in bases for base in klass.__mro__):
+            attrs[child_name] = _child_property(child_name)
+
+    attrs["_children"] = children
+    if node.param is not None:
+        attrs["_param_class"] = _compile_resource(node.param, resource_class, "%s_detail" % name)
+
+    return type(str(class_name), bases, attrs)
+
+
+def compile_api(api_class, tree):
+    """
+    Returns a subclass of api_class whose resources are compiled from tree.
+    """
+    resource_class = api_class.resource_class
+    return _compile_class(tree, resource_class, (CompiledResourceMixin, api_class), None,
+                          "Schema" + api_class.__name__, {})
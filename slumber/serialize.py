@@ -1,25 +1,59 @@
+import importlib
+import io
+
 from slumber import exceptions
 
+try:
+    from importlib.util import find_spec
+except ImportError:
+    import imp
+
+    def find_spec(name):
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return None
+        return True
+
+# Backends are only imported the first time a serializer actually uses them,
+# so ``import slumber`` doesn't pay for pyyaml when only json is used.
 _SERIALIZERS = {
-    "json": True,
-    "yaml": True,
+    "json": "json",
+    "yaml": "yaml",
+    "ndjson": "json",
 }
 
-try:
-    import json
-except ImportError:
-    _SERIALIZERS["json"] = False
+_AVAILABLE = {}
 
-try:
-    import yaml
-except ImportError:
-    _SERIALIZERS["yaml"] = False
+_UTF8 = ("utf-8", "utf8")
+
+
+def is_available(key):
+    """
+    Returns whether the backend module for the serializer key can be
+    imported, without importing it.
+    """
+    if key not in _AVAILABLE:
+        module = _SERIALIZERS.get(key)
+        _AVAILABLE[key] = module is not None and find_spec(module) is not None
+    return _AVAILABLE[key]
 
 
 class BaseSerializer(object):
 
     content_types = None
     key = None
+    module = None
+
+    @property
+    def backend(self):
+        """
+        The backend module of this serializer, imported on first access.
+        """
+        cls = type(self)
+        if cls.__dict__.get("_backend") is None:
+            cls._backend = importlib.import_module(self.module)
+        return cls._backend
 
     def get_content_type(self):
         if self.content_types is None:
@@ -29,6 +63,20 @@ class BaseSerializer(object):
     def loads(self, data):
         raise NotImplementedError()
 
+    def loads_bytes(self, data, encoding=None):
+        """
+        Deserializes a response body given as bytes or a memoryview, encoded
+        with encoding (the charset of the response) or a guessed one. This
+        decodes the body to text first; serializers whose backend parses
+        bytes itself override it to skip that copy.
+        """
+        if encoding is None:
+            from requests.utils import guess_json_utf
+            encoding = guess_json_utf(bytes(data[:4])) or "utf-8"
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self.loads(data.decode(encoding))
+
     def dumps(self, data):
         raise NotImplementedError()
 
@@ -43,34 +91,96 @@ class JsonSerializer(BaseSerializer):
                         "text/x-json",
                     ]
     key = "json"
+    module = "json"
 
     def loads(self, data):
-        return json.loads(data)
+        return self.backend.loads(data)
+
+    def loads_bytes(self, data, encoding=None):
+        # json detects utf-8, utf-16 and utf-32 in bytes on its own
+        if (encoding is None or encoding.lower() in _UTF8) and isinstance(data, bytes):
+            try:
+                return self.backend.loads(data)
+            except TypeError:
+                # Python 3 before 3.6 only parses text
+                pass
+        return super(JsonSerializer, self).loads_bytes(data, encoding)
 
     def dumps(self, data):
-        return json.dumps(data)
+        return self.backend.dumps(data)
 
 
 class YamlSerializer(BaseSerializer):
 
     content_types = ["text/yaml"]
     key = "yaml"
+    module = "yaml"
+
+    def loads(self, data):
+        return self.backend.safe_load(data)
+
+    def loads_bytes(self, data, encoding=None):
+        # yaml reads utf-8 and (with a byte order mark) utf-16 bytes directly
+        if encoding is None or encoding.lower() in _UTF8:
+            if isinstance(data, memoryview):
+                data = data.tobytes()
+            return self.backend.safe_load(data)
+        return super(YamlSerializer, self).loads_bytes(data, encoding)
+
+    def dumps(self, data):
+        return self.backend.dump(data)
+
+
+class NdjsonSerializer(BaseSerializer):
+    """
+    Newline delimited json, one object per line. ``dumps`` encodes an
+    iterable of objects lazily, so it can be sent as a chunked upload, and
+    ``loads`` and ``iter_loads`` are generators decoding a line at a time.
+    """
+
+    content_types = [
+                        "application/x-ndjson",
+                        "application/jsonl",
+                        "application/x-jsonlines",
+                    ]
+    key = "ndjson"
+    module = "json"
 
     def loads(self, data):
-        return yaml.safe_load(str(data))
+        if isinstance(data, (bytes, memoryview)):
+            data = io.BytesIO(data)
+        elif not hasattr(data, "read"):
+            data = io.StringIO(data)
+        return self.iter_loads(data)
+
+    def loads_bytes(self, data, encoding=None):
+        if encoding is None or encoding.lower() in _UTF8:
+            return self.loads(data)
+        return super(NdjsonSerializer, self).loads_bytes(data, encoding)
+
+    def iter_loads(self, lines):
+        loads = self.backend.loads
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if line.strip():
+                yield loads(line)
 
     def dumps(self, data):
-        return yaml.dump(data)
+        if isinstance(data, dict):
+            data = [data]
+        dumps = self.backend.dumps
+        return ((dumps(obj) + "\n").encode("utf-8") for obj in data)
 
 
 class Serializer(object):
 
     def __init__(self, default=None, serializers=None):
         if default is None:
-            default = "json" if _SERIALIZERS["json"] else "yaml"
+            default = "json" if is_available("json") else "yaml"
 
         if serializers is None:
-            serializers = [x() for x in [JsonSerializer, YamlSerializer] if _SERIALIZERS[x.key]]
+            serializers = [x() for x in [JsonSerializer, YamlSerializer, NdjsonSerializer] if is_available(x.key)]
 
         if not serializers:
             raise exceptions.SerializerNoAvailable("There are no Available Serializers.")
@@ -0,0 +1,105 @@
+import logging
+import threading
+
+__all__ = ["SlowCallLog", "PHASES"]
+
+PHASES = ("serialize", "network", "deserialize")
+
+
+class SlowCallLog(object):
+    """
+    A tracing processor which logs every call that takes threshold seconds
+    or more, with its url template, the bytes sent and received and the
+    time spent in each phase.
+
+    profile_rate is the share of calls whose deserialize phase runs under
+    cProfile; when one of those calls turns out to be slow the profile_limit
+    most expensive functions are added to the log message.
+    """
+
+    def __init__(self, threshold=0.5, logger=None, level=logging.WARNING, profile_rate=0.0, profile_limit=15):
+        self.threshold = threshold
+        self.logger = logger if logger is not None else logging.getLogger("slumber.slow")
+        self.level = level
+        self.profile_rate = profile_rate
+        self.profile_limit = profile_limit
+        self.calls = 0
+        self.slow_calls = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._profilers = {}
+
+    def on_start(self, span):
+        if span.name != "deserialize" or not self.profile_rate:
+            return
+
+        import random
+        if random.random() >= self.profile_rate:
+            return
+
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        with self._lock:
+            self._profilers[span.span_id] = profiler
+
+    def on_end(self, span):
+        if span.name in PHASES:
+            with self._lock:
+                profiler = self._profilers.pop(span.span_id, None)
+                call = self._pending.setdefault(span.parent_id, {"phases": {}})
+            if profiler is not None:
+                profiler.disable()
+                call["profile"] = profiler
+            call["phases"][span.name] = span.duration
+            for key in ("http.request_size", "http.response_size"):
+                if key in span.attributes:
+                    call[key] = span.attributes[key]
+        elif "http.method" in span.attributes:
+            with self._lock:
+                call = self._pending.pop(span.span_id, {"phases": {}})
+                self.calls += 1
+                if span.duration < self.threshold:
+                    return
+                self.slow_calls += 1
+            self._log(span, call)
+
+    def _log(self, span, call):
+        phases = call["phases"]
+        breakdown = ", ".join("%s %.1fms" % (name, phases[name] * 1000) for name in PHASES if name in phases)
+        message = "Slow call %s took %.1fms (%s), sent %d bytes, received %d bytes"
+        args = [span.name, span.duration * 1000, breakdown or "no phases",
+                call.get("http.request_size", 0), call.get("http.response_size", 0)]
+
+        if "profile" in call:
+            message += "\n%s"
+            args.append(self._format_profile(call["profile"]))
+
+        self.logger.log(self.level, message, *args, extra={"slumber_call": {
+            "template": span.name,
+            "url": span.attributes.get("http.url"),
+            "duration": span.duration,
+            "phases": phases,
+            "bytes_out": call.get("http.request_size", 0),
+            "bytes_in": call.get("http.response_size", 0),
+            "error": span.attributes.get("error"),
+        }})
+
+    def _format_profile(self, profiler):
+        import pstats
+        try:
+            from io import StringIO
+        except ImportError:
+            from StringIO import StringIO
+
+        stream = StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.profile_limit)
+        return stream.getvalue().strip()
+
+    def snapshot(self):
+        with self._lock:
+            return {"calls": self.calls, "slow_calls": self.slow_calls}
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from . import exceptions
+from .utils import paginate
+
+__all__ = ["SyncStore", "SyncResult"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS collections (
+    collection TEXT PRIMARY KEY,
+    cursor TEXT,
+    etag TEXT,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+def _newer(version, cursor):
+    # Versions are compared as the API sends them, numbers as numbers; a
+    # string of digits (e.g. an ETag counter) counts as a number too
+    if cursor is None:
+        return True
+    if hasattr(version, "isdigit") and hasattr(cursor, "isdigit") and version.isdigit() and cursor.isdigit():
+        return int(version) > int(cursor)
+    try:
+        return version > cursor
+    except TypeError:
+        return "%s" % version > "%s" % cursor
+
+
+def _load_cursor(value):
+    # Cursors are stored as json to keep their type; older stores kept text
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class SyncResult(object):
+    """
+    What changed in a collection since the last sync: the inserted and
+    updated objects, the ids of deleted ones and the number of objects which
+    were fetched but didn't change.
+    """
+
+    __slots__ = ("inserted", "updated", "deleted", "unchanged", "full", "not_modified")
+
+    def __init__(self, full):
+        self.inserted = []
+        self.updated = []
+        self.deleted = []
+        self.unchanged = 0
+        self.full = full
+        self.not_modified = False
+
+    def __len__(self):
+        return len(self.inserted) + len(self.updated) + len(self.deleted)
+
+    def __repr__(self):
+        return "<SyncResult inserted=%d updated=%d deleted=%d unchanged=%d>" % (
+            len(self.inserted), len(self.updated), len(self.deleted), self.unchanged)
+
+
+class SyncStore(object):
+    """
+    Keeps the id and version of every object of the synced collections in a
+    SQLite database at path, so ``sync`` only has to report (and, where the
+    API can filter on it, fetch) what changed since the previous run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def sync(self, resource, id_field="id", version_field=None, since_param=None, deleted_field=None,
+             params=None, full=False):
+        """
+        Fetches the collection behind resource and returns a SyncResult.
+
+        version_field names the field which changes with every update of an
+        object (e.g. ``updated_at``); without it objects are compared by a
+        hash of their content. With since_param the greatest version seen is
+        remembered and later syncs only ask for objects past it, e.g.
+        ``?updated_since=2016-01-01T10:00:00``. Such incremental syncs only
+        see deletions the API reports as objects with a true deleted_field;
+        a full sync (the first one, or full=True) deletes every object which
+        is no longer listed.
+
+        Tastypie style paginated responses are followed through
+        ``meta.next``. A single page collection is fetched with
+        ``If-None-Match`` on full syncs, so an unchanged collection costs a
+        304 response.
+        """
+        collection = resource.url()
+
+        with self._lock, self._conn:
+            state = self._conn.execute("SELECT cursor, etag, generation FROM collections WHERE collection = ?",
+                                       (collection,)).fetchone()
+            cursor, etag, generation = state or (None, None, 0)
+            cursor = _load_cursor(cursor)
+
+            full = full or since_param is None or version_field is None or cursor is None
+            result = SyncResult(full)
+            generation += 1
+
+            query = dict(params or {})
+            if not full:
+                query[since_param] = cursor
+            headers = {"If-None-Match": etag} if full and etag else None
+
+            pages = 0
+            new_etag = None
+            while query is not None:
+                resp = resource._request("GET", params=query, headers=headers)
+                if resp.status_code == 304:
+                    result.not_modified = True
+                    return result
+
+                objects, query = paginate(resource._try_to_serialize_response(resp))
+                if not isinstance(objects, list):
+                    raise exceptions.ImproperlyConfigured("Synced resources must return a list of objects")
+                pages += 1
+                if pages == 1:
+                    new_etag = resp.headers.get("etag")
+                headers = None
+
+                for obj in objects:
+                    cursor = self._apply(collection, obj, generation, result, id_field, version_field,
+                                         deleted_field, cursor)
+
+            if full:
+                removed = self._conn.execute("SELECT id FROM objects WHERE collection = ? AND generation < ?",
+                                             (collection, generation)).fetchall()
+                self._conn.execute("DELETE FROM objects WHERE collection = ? AND generation < ?",
+                                   (collection, generation))
+                result.deleted.extend(row[0] for row in removed)
+
+            self._conn.execute("INSERT OR REPLACE INTO collections (collection, cursor, etag, generation) "
+                               "VALUES (?, ?, ?, ?)",
+                               (collection, None if cursor is None else json.dumps(cursor),
+                                new_etag if pages == 1 else None, generation))
+
+        return result
+
+    def _apply(self, collection, obj, generation, result, id_field, version_field, deleted_field, cursor):
+        obj_id = "%s" % obj[id_field]
+
+        if version_field is None:
+            version = hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        else:
+            raw = obj.get(version_field)
+            version = "%s" % raw
+            if raw is not None and _newer(raw, cursor):
+                cursor = raw
+
+        if deleted_field is not None and obj.get(deleted_field):
+            deleted = self._conn.execute("DELETE FROM objects WHERE collection = ? AND id = ?", (collection, obj_id))
+            if deleted.rowcount:
+                result.deleted.append(obj_id)
+            return cursor
+
+        row = self._conn.execute("SELECT version FROM objects WHERE collection = ? AND id = ?",
+                                 (collection, obj_id)).fetchone()
+        if row is None:
+            result.inserted.append(obj)
+        elif row[0] != version:
+            result.updated.append(obj)
+        else:
+            result.unchanged += 1
+
+        self._conn.execute("INSERT OR REPLACE INTO objects (collection, id, version, generation) VALUES (?, ?, ?, ?)",
+                           (collection, obj_id, version, generation))
+        return cursor
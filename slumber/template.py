@@ -0,0 +1,69 @@
+import string
+
+from . import ResourceAttributesMixin
+from .schema import compiled_method
+from .utils import url_join, copy_kwargs, iterator
+
+__all__ = ["URLTemplate"]
+
+
+class URLTemplate(object):
+    """
+    A resource path with ``{placeholders}`` compiled once against an API, so
+    that calling it only costs a single string format instead of chaining
+    several Resource objects::
+
+        posts = api.compile("orgs/{org}/users/{uid}/posts")
+        posts.get(org="acme", uid=5, limit=10)
+
+    Keyword arguments named after a placeholder fill in the path, all others
+    become query parameters (or ``data``/``files`` for methods with a body).
+    """
+
+    def __init__(self, api, path):
+        self._api = api
+        self._store = api._store
+        self.path = path
+
+        base_url = self._store["base_url"].replace("{", "{{").replace("}", "}}")
+        url = url_join(base_url, path)
+        template = url_join(self._store["template"], path)
+        if self._store["append_slash"] and not url.endswith("/"):
+            url = url + "/"
+            template = template + "/"
+
+        self._format = url
+        self.template = template
+        self.fields = tuple(name for _, name, _, _ in string.Formatter().parse(path) if name)
+        # "users/{uid}" decodes like "users"
+        self._detail = path.rstrip("/").endswith("}")
+
+    def url(self, **kwargs):
+        return self._format.format(**kwargs)
+
+    def _resource(self, kwargs):
+        values = {}
+        for name in self.fields:
+            try:
+                values[name] = kwargs.pop(name)
+            except KeyError:
+                raise TypeError("%s is missing the url parameter %r" % (self.path, name))
+
+        store = copy_kwargs(self._store)
+        store["base_url"] = self._format.format(**values)
+        store["template"] = self.template
+        if self._detail:
+            store["collection_url"] = store["base_url"].rstrip("/").rsplit("/", 1)[0]
+        return self._api._get_resource(**store)
+
+    def _perform_compiled(self, spec, kwargs):
+        resource = self._resource(kwargs)
+        resource._call = spec
+        return resource._perform_action(**kwargs)
+
+    def __repr__(self):
+        return "<URLTemplate %s>" % self._format
+
+
+for _name, _spec in iterator(ResourceAttributesMixin._methods):
+    setattr(URLTemplate, _name, compiled_method(_name, _spec))
@@ -0,0 +1,184 @@
+import binascii
+import os
+import re
+import threading
+import time
+
+from .metrics import clock
+
+__all__ = ["Tracer", "Span", "InMemoryExporter", "parse_traceparent", "NULL_SPAN"]
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def _random_id(size):
+    return binascii.hexlify(os.urandom(size)).decode("ascii")
+
+
+def parse_traceparent(header):
+    """
+    Parses a W3C ``traceparent`` header into (trace_id, span_id, sampled),
+    or returns None if it isn't valid.
+    """
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None:
+        return None
+
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+class Span(object):
+    """
+    A timed operation of a trace. Spans are context managers: entering one
+    makes it the current span of the thread, so spans started inside it
+    become its children, and leaving it ends it and hands it to the exporter.
+    """
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "sampled", "attributes",
+                 "start_time", "duration", "_start", "_previous")
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, sampled=True, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _random_id(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.duration = None
+        self._start = clock()
+        self._previous = None
+
+    @property
+    def traceparent(self):
+        if not self.tracer.propagate:
+            return None
+        return "00-%s-%s-%s" % (self.trace_id, self.span_id, "01" if self.sampled else "00")
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self):
+        if self.duration is None:
+            self.duration = clock() - self._start
+            for processor in self.tracer.processors:
+                processor.on_end(self)
+            if self.sampled and self.tracer.exporter is not None:
+                self.tracer.exporter.export(self)
+
+    def __enter__(self):
+        self._previous = self.tracer._swap(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._swap(self._previous)
+        self.end()
+        return False
+
+    def __repr__(self):
+        return "<Span %s %s>" % (self.name, self.span_id)
+
+
+class _NullSpan(object):
+    """
+    Stands in for a span when no tracer is configured.
+    """
+
+    __slots__ = ()
+
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    """
+    Creates spans and hands finished ones to exporter, any object with an
+    ``export(span)`` method. Traces are sampled at their root with
+    sample_rate; spans of traces which aren't sampled are still created, so
+    the ``traceparent`` header is propagated, but never exported.
+
+    Processors (see ``add_processor``) see every span, sampled or not, as it
+    starts and ends. With propagate False no ``traceparent`` header is sent.
+    """
+
+    def __init__(self, exporter=None, sample_rate=1.0, propagate=True):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.propagate = propagate
+        self.processors = []
+        self._local = threading.local()
+
+    def add_processor(self, processor):
+        """
+        Adds an object with ``on_start(span)`` and ``on_end(span)`` methods.
+        """
+        self.processors.append(processor)
+
+    def current_span(self):
+        return getattr(self._local, "span", None)
+
+    def _swap(self, span):
+        previous = getattr(self._local, "span", None)
+        self._local.span = span
+        return previous
+
+    def span(self, name, parent=None, **attributes):
+        """
+        Starts a span, a child of parent (a Span or a ``traceparent`` header
+        received from upstream) or of the current span of the thread.
+        """
+        if parent is None:
+            parent = self.current_span()
+        elif not isinstance(parent, Span):
+            parent = parse_traceparent(parent)
+
+        if isinstance(parent, Span):
+            span = Span(self, name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+        elif parent is not None:
+            trace_id, parent_id, sampled = parent
+            span = Span(self, name, trace_id, parent_id, sampled, attributes)
+        else:
+            sampled = self.sample_rate >= 1 or int(_random_id(4), 16) < self.sample_rate * 0xffffffff
+            span = Span(self, name, _random_id(16), None, sampled, attributes)
+
+        for processor in self.processors:
+            processor.on_start(span)
+        return span
+
+
+class InMemoryExporter(object):
+    """
+    Keeps finished spans in a list, for tests.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def get(self, name):
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self):
+        with self._lock:
+            del self.spans[:]
@@ -1,9 +1,9 @@
 import posixpath
 
 try:
-    from urllib.parse import urlsplit, urlunsplit
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl
 except ImportError:
-    from urlparse import urlsplit, urlunsplit
+    from urlparse import urlsplit, urlunsplit, parse_qsl
 
 
 def url_join(base, *args):
@@ -15,6 +15,20 @@ def url_join(base, *args):
     path = posixpath.join(path, *[('%s' % x) for x in args])
     return urlunsplit([scheme, netloc, path, query, fragment])
 
+def request_key(method, url, params=None, data=None):
+    """
+    Helper to compute a key identifying a request by its method, full url
+    (including the query string) and body.
+    """
+    import hashlib
+    from requests import Request
+
+    prepared = Request(method.upper(), url, params=params).prepare()
+    digest = hashlib.sha1(("%s %s\n" % (prepared.method, prepared.url)).encode("utf-8"))
+    if data is not None and not hasattr(data, "read"):
+        digest.update(data if isinstance(data, bytes) else ("%s" % data).encode("utf-8"))
+    return digest.hexdigest()
+
 def copy_kwargs(dictionary):
 	kwargs = {}
 	for key, value in iterator(dictionary):
@@ -30,3 +44,82 @@ def iterator(d):
         return d.iteritems()
     except AttributeError:
         return d.items()
+
+
+def paginate(data):
+    """
+    Helper to split a collection response into its objects and the query
+    parameters of the next page (Tastypie's ``meta.next``), or None if this
+    is the last one.
+    """
+    if isinstance(data, dict) and "objects" in data:
+        next_url = (data.get("meta") or {}).get("next")
+        return data["objects"], dict(parse_qsl(urlsplit(next_url).query)) if next_url else None
+    return data, None
+
+
+def compile_fields(fields):
+    """
+    Helper to turn a list of field paths such as ``["id", "meta.next",
+    "objects[].name"]`` into a nested selector usable by ``project``.
+    """
+    selector = {}
+    for field in fields:
+        node = selector
+        segments = []
+        for part in field.split("."):
+            depth = 0
+            while part.endswith("[]"):
+                part = part[:-2]
+                depth += 1
+            if part:
+                segments.append(part)
+            segments.extend(["[]"] * depth)
+
+        for segment in segments[:-1]:
+            if segment in node and node[segment] is None:
+                # The whole field is selected already, including this path
+                node = None
+                break
+            node = node.setdefault(segment, {})
+
+        if segments and node is not None:
+            node[segments[-1]] = None
+
+    return selector
+
+
+def field_paths(fields):
+    """
+    Helper to turn field paths as accepted by ``compile_fields`` into the
+    dotted paths of a sparse fieldset parameter, without the ``[]`` list
+    markers: ``"objects[].name"`` becomes ``"objects.name"``.
+    """
+    paths = []
+    for field in fields:
+        path = ".".join(part for part in field.replace("[]", "").split(".") if part)
+        if path and path not in paths:
+            paths.append(path)
+    return paths
+
+
+def project(data, selector):
+    """
+    Helper to reduce decoded data to the paths described by a selector built
+    with ``compile_fields``. Lists are projected element by element.
+    """
+    if selector is None:
+        return data
+
+    if isinstance(data, list):
+        item_selector = selector.get("[]", selector)
+        return [project(item, item_selector) for item in data]
+
+    if isinstance(data, dict):
+        projected = {}
+        for key, child in iterator(selector):
+            if key != "[]" and key in data:
+                projected[key] = project(data[key], child)
+        return projected
+
+    return data
@@ -9,10 +9,45 @@ def full_suite():
     from .resource import ResourceTestCase
     from .serializer import ResourceTestCase as SerializerTestCase
     from .utils import UtilsTestCase
+    from .metrics import MetricsTestCase
+    from .recording import RecordingTestCase
+    from .imports import ImportTestCase
+    from .schema import SchemaTestCase
+    from .balancer import BalancerTestCase
+    from .hedging import HedgingTestCase
+    from .process import ProcessTestCase
+    from .limits import LimitsTestCase
+    from .tracing import TracingTestCase
+    from .slowcalls import SlowCallsTestCase
+    from .sync import SyncTestCase
+    from .cache import CacheTestCase
+    from .batch import BatchTestCase
+    from .aio import AioTestCase
+    from .exceptions import ExceptionsTestCase
+    from .columns import ColumnsTestCase
 
     resourcesuite = unittest.TestLoader().loadTestsFromTestCase(ResourceTestCase)
     serializersuite = unittest.TestLoader().loadTestsFromTestCase(SerializerTestCase)
     utilssuite = unittest.TestLoader().loadTestsFromTestCase(UtilsTestCase)
+    metricssuite = unittest.TestLoader().loadTestsFromTestCase(MetricsTestCase)
+    recordingsuite = unittest.TestLoader().loadTestsFromTestCase(RecordingTestCase)
+    importssuite = unittest.TestLoader().loadTestsFromTestCase(ImportTestCase)
+    schemasuite = unittest.TestLoader().loadTestsFromTestCase(SchemaTestCase)
+    balancersuite = unittest.TestLoader().loadTestsFromTestCase(BalancerTestCase)
+    hedgingsuite = unittest.TestLoader().loadTestsFromTestCase(HedgingTestCase)
+    processsuite = unittest.TestLoader().loadTestsFromTestCase(ProcessTestCase)
+    limitssuite = unittest.TestLoader().loadTestsFromTestCase(LimitsTestCase)
+    tracingsuite = unittest.TestLoader().loadTestsFromTestCase(TracingTestCase)
+    slowcallssuite = unittest.TestLoader().loadTestsFromTestCase(SlowCallsTestCase)
+    syncsuite = unittest.TestLoader().loadTestsFromTestCase(SyncTestCase)
+    cachesuite = unittest.TestLoader().loadTestsFromTestCase(CacheTestCase)
+    batchsuite = unittest.TestLoader().loadTestsFromTestCase(BatchTestCase)
+    aiosuite = unittest.TestLoader().loadTestsFromTestCase(AioTestCase)
+    exceptionssuite = unittest.TestLoader().loadTestsFromTestCase(ExceptionsTestCase)
+    columnssuite = unittest.TestLoader().loadTestsFromTestCase(ColumnsTestCase)
 
-    return unittest.TestSuite([resourcesuite, serializersuite, utilssuite])
+    return unittest.TestSuite([resourcesuite, serializersuite, utilssuite, metricssuite, recordingsuite,
+                               importssuite, schemasuite, balancersuite, hedgingsuite, processsuite,
+                               limitssuite, tracingsuite, slowcallssuite, syncsuite, cachesuite,
+                               batchsuite, aiosuite, exceptionssuite, columnssuite])
 
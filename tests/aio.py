@@ -0,0 +1,115 @@
+import json
+import sys
+import threading
+import time
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+
+def collect(agen, limit=None):
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    items = []
+    try:
+        while limit is None or len(items) < limit:
+            try:
+                items.append(loop.run_until_complete(agen.__anext__()))
+            except StopAsyncIteration:
+                break
+        loop.run_until_complete(agen.aclose())
+    finally:
+        loop.close()
+    return items
+
+
+@unittest.skipIf(sys.version_info < (3, 6), "async generators require Python 3.6")
+class AioTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.side_effect = self._request
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session)
+
+    def _response(self, data, content_type="application/json"):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": content_type}
+        r.content = json.dumps(data).encode("utf-8")
+        return r
+
+    def _request(self, method, url, params=None, **kwargs):
+        with self.lock:
+            self.calls.append((url, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+
+        if url.endswith("/events/"):
+            offset = int(params.get("offset", 0))
+            next_url = "/api/v1/events/?offset=%s" % (offset + 2) if offset < 10 else None
+            return self._response({"meta": {"next": next_url}, "objects": [{"id": offset}, {"id": offset + 1}]})
+        return self._response({"id": int(url.rstrip("/").rsplit("/", 1)[1])})
+
+    def test_aiter(self):
+        events = collect(self.api.events.aiter(limit=2))
+        self.assertEqual([event["id"] for event in events], list(range(12)))
+        self.assertEqual(self.calls[0], ("http://example/api/v1/events/", {"limit": 2}))
+        self.assertEqual(self.calls[1], ("http://example/api/v1/events/", {"offset": "2"}))
+
+    def test_aiter_backpressure(self):
+        events = collect(self.api.events.aiter(prefetch=1), limit=1)
+        self.assertEqual(events, [{"id": 0}])
+        time.sleep(0.1)
+        # One page consumed, one queued and at most one more being fetched
+        self.assertLessEqual(len(self.calls), 3)
+
+    def test_aiter_stream(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/x-ndjson"}
+        r.iter_lines.return_value = iter([b'{"id": %d}' % i for i in range(5)])
+        self.session.request.side_effect = None
+        self.session.request.return_value = r
+
+        events = collect(self.api.events.aiter(stream=True, chunk_size=2))
+        self.assertEqual([event["id"] for event in events], list(range(5)))
+
+    def test_aiter_error(self):
+        self.session.request.side_effect = requests.ConnectionError()
+        self.assertRaises(requests.ConnectionError, collect, self.api.events.aiter())
+
+    def test_amap(self):
+        from slumber.aio import amap
+
+        users = collect(amap(self.api.users, (i for i in range(20)), concurrency=4))
+        self.assertEqual([user["id"] for user in users], list(range(20)))
+        self.assertLessEqual(self.max_in_flight, 4)
+        self.assertGreater(self.max_in_flight, 1)
+
+    def test_amap_limiter(self):
+        from slumber.aio import amap
+        from slumber.limits import ConcurrencyLimiter
+
+        limiter = ConcurrencyLimiter(max_in_flight=12)
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, limiter=limiter)
+
+        users = collect(amap(api.users, range(30)))
+        self.assertEqual([user["id"] for user in users], list(range(30)))
+        self.assertGreater(self.max_in_flight, 8)
+        self.assertLessEqual(self.max_in_flight, 12)
+
+        # The limit is followed as it changes
+        limiter.max_in_flight = 2
+        self.max_in_flight = 0
+        collect(amap(api.users, range(10)))
+        self.assertLessEqual(self.max_in_flight, 2)
@@ -0,0 +1,76 @@
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.balancer import EndpointPool
+
+
+class BalancerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.urls = ["http://a/api/v1/", "http://b/api/v1/"]
+
+    def _response(self, status_code=200):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = status_code
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"ok": true}'
+        return r
+
+    def test_round_robin(self):
+        pool = EndpointPool(self.urls)
+        picked = []
+        for _ in range(4):
+            endpoint = pool.acquire()
+            pool.release(endpoint, 0.01)
+            picked.append(endpoint.url)
+        self.assertEqual(picked, ["http://a/api/v1", "http://b/api/v1"] * 2)
+
+    def test_least_outstanding(self):
+        pool = EndpointPool(self.urls, policy="least_outstanding")
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertNotEqual(first, second)
+        pool.release(first, 0.01)
+        self.assertEqual(pool.acquire(), first)
+
+    def test_ewma(self):
+        pool = EndpointPool(self.urls, policy="ewma")
+        slow, fast = pool.endpoints
+        pool.release(pool.acquire(exclude=[fast]), 1.0)
+        pool.release(pool.acquire(exclude=[slow]), 0.01)
+        self.assertEqual(pool.acquire(), fast)
+
+    def test_ejection(self):
+        pool = EndpointPool(self.urls, max_failures=2, eject_time=60)
+        bad = pool.endpoints[0]
+        for _ in range(2):
+            bad.outstanding += 1
+            pool.release(bad, 0.01, ok=False)
+
+        self.assertTrue(pool.snapshot()["http://a/api/v1"]["ejected"])
+        self.assertEqual(set(pool.acquire() for _ in range(3)), set([pool.endpoints[1]]))
+
+        pool.health_check = lambda url: True
+        pool.check_health()
+        self.assertFalse(pool.snapshot()["http://a/api/v1"]["ejected"])
+
+    def test_rewrite(self):
+        pool = EndpointPool(self.urls)
+        b = pool.endpoints[1]
+        self.assertEqual(pool.rewrite("http://a/api/v1/users/1/", b), "http://b/api/v1/users/1/")
+        self.assertEqual(pool.rewrite("http://a/api/v10/users/", b), "http://a/api/v10/users/")
+
+    def test_api_failover(self):
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = (requests.ConnectionError(), self._response())
+
+        client = slumber.API(base_url=self.urls, session=session)
+        self.assertEqual(client.users(1).get(), {"ok": True})
+        self.assertEqual([c[0][1] for c in session.request.call_args_list],
+                         ["http://a/api/v1/users/1/", "http://b/api/v1/users/1/"])
+
+        session.request.side_effect = (requests.ConnectionError(), self._response())
+        with self.assertRaises(requests.ConnectionError):
+            client.users.post(data={"name": "x"})
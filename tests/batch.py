@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import exceptions
+from slumber.batch import BatchLoader, chunk_ids
+from slumber.limits import AIMDLimit, ConcurrencyLimiter
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.side_effect = self._request
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session)
+
+    def _request(self, method, url, params=None, **kwargs):
+        self.calls.append((url, params))
+        if "/set/" in url:
+            ids = url.rstrip("/").rsplit("/", 1)[1].split(";")
+        else:
+            ids = params["id__in"].split(",")
+        # The server knows about even ids only, and answers in its own order
+        objects = [{"id": int(i), "name": "user %s" % i} for i in sorted(ids, reverse=True) if int(i) % 2 == 0]
+
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = json.dumps({"meta": {}, "objects": objects}).encode("utf-8")
+        return r
+
+    def test_chunk_ids(self):
+        self.assertEqual(list(chunk_ids([1, 22, 333, 4], 6)), [[1, 22], [333, 4]])
+        self.assertEqual(list(chunk_ids(["abcdefgh"], 4)), [["abcdefgh"]])
+        self.assertEqual(list(chunk_ids([], 4)), [])
+
+    def test_get_many(self):
+        users = self.api.users.get_many([4, 2, 3, 4], limit=0)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.calls[0], ("http://example/api/v1/users/", {"id__in": "4,2,3", "limit": 0}))
+        self.assertEqual([user and user["id"] for user in users], [4, 2, None, 4])
+        self.assertEqual(users.missing, [3])
+
+    def test_set_style(self):
+        users = self.api.users.get_many([2, 1], style="set")
+        self.assertEqual(self.calls[0][0], "http://example/api/v1/users/set/2;1/")
+        self.assertEqual([user and user["id"] for user in users], [2, None])
+
+    def test_chunking(self):
+        ids = list(range(100, 400))
+        users = self.api.users.get_many(ids, max_url_length=200)
+
+        self.assertGreater(len(self.calls), 1)
+        for url, params in self.calls:
+            prepared = requests.Request("GET", url, params=params).prepare()
+            self.assertLessEqual(len(prepared.url), 200)
+        self.assertEqual(sorted(id for url, params in self.calls for id in params["id__in"].split(",")),
+                         sorted("%s" % i for i in ids))
+        self.assertEqual([user and user["id"] for user in users], [i if i % 2 == 0 else None for i in ids])
+        self.assertEqual(len(users.missing), 150)
+
+    def test_limiter_workers(self):
+        lock = threading.Lock()
+        counts = {"in_flight": 0, "max": 0}
+
+        def request(*args, **kwargs):
+            with lock:
+                counts["in_flight"] += 1
+                counts["max"] = max(counts["max"], counts["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                counts["in_flight"] -= 1
+            return self._request(*args, **kwargs)
+
+        self.session.request.side_effect = request
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session,
+                          limiter=ConcurrencyLimiter(max_in_flight=AIMDLimit(initial=8, max_limit=8)))
+        api.users.get_many(list(range(100, 400)), max_url_length=150)
+
+        # More than the 4 workers used without a limiter, and no more than it allows
+        self.assertGreater(counts["max"], 4)
+        self.assertLessEqual(counts["max"], 8)
+
+    def test_pagination(self):
+        def request(method, url, params=None, **kwargs):
+            self.calls.append((url, params))
+            ids = sorted(int(i) for i in params["id__in"].split(","))
+            offset = int(params.get("offset", 0))
+            next_url = None
+            if offset + 2 < len(ids):
+                next_url = "/api/v1/users/?id__in=%s&limit=2&offset=%s" % (params["id__in"], offset + 2)
+
+            r = mock.Mock(spec=requests.Response)
+            r.status_code = 200
+            r.headers = {"content-type": "application/json"}
+            r.content = json.dumps({"meta": {"next": next_url},
+                                    "objects": [{"id": i} for i in ids[offset:offset + 2]]}).encode("utf-8")
+            return r
+
+        self.session.request.side_effect = request
+        users = self.api.users.get_many([5, 1, 4, 2, 3])
+
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.calls[2][1], {"id__in": "5,1,4,2,3", "limit": "2", "offset": "4"})
+        self.assertEqual([user["id"] for user in users], [5, 1, 4, 2, 3])
+        self.assertEqual(users.missing, [])
+
+    def test_result_mode(self):
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, return_result=True)
+        self.assertEqual(api.users.get_many([2])[0]["id"], 2)
+
+    def test_loader(self):
+        loader = BatchLoader(self.api.users, window=0.05)
+        results = {}
+
+        def get(i):
+            try:
+                results[i] = loader.get(i)["id"]
+            except exceptions.HttpNotFoundError:
+                results[i] = None
+
+        threads = [threading.Thread(target=get, args=(i,)) for i in range(1, 7)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {1: None, 2: 2, 3: None, 4: 4, 5: None, 6: 6})
+        self.assertLess(len(self.calls), 6)
@@ -0,0 +1,106 @@
+import json
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.cache import ObjectCache
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.side_effect = self._request
+        self.cache = ObjectCache(ttl=60)
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session, object_cache=self.cache)
+
+    def _request(self, method, url, **kwargs):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200 if method == "GET" else 202
+        r.headers = {"content-type": "application/json"}
+        r.content = json.dumps({"url": url, "params": kwargs.get("params")}).encode("utf-8")
+        return r
+
+    def test_read_through(self):
+        first = self.api.users(5).get()
+        second = self.api.users(5).get()
+
+        self.assertEqual(first, second)
+        self.assertFalse(first is second)
+        self.assertEqual(self.session.request.call_count, 1)
+
+        self.api.users(5).get(limit=1)
+        self.api.users(5).get(limit=1)
+        self.assertEqual(self.session.request.call_count, 2)
+
+        snapshot = self.cache.snapshot()
+        self.assertEqual((snapshot["hits"], snapshot["misses"], snapshot["entries"]), (2, 2, 2))
+        self.assertEqual(snapshot["hit_ratio"], 0.5)
+        self.assertGreater(snapshot["bytes"], 0)
+
+    def test_invalidate_on_write(self):
+        self.api.users.get()
+        self.api.users(5).get()
+        self.api.users(6).get()
+        self.api.groups.get()
+
+        self.api.users(5).patch(data={"name": "x"})
+        self.assertEqual(self.cache.snapshot()["entries"], 2)
+
+        self.api.users(5).get()
+        self.api.users.get()
+        self.api.users(6).get()
+        self.assertEqual(self.session.request.call_count, 7)
+
+    def test_write_error_invalidates(self):
+        self.api.users(5).get()
+        self.session.request.side_effect = requests.ConnectionError()
+        self.assertRaises(requests.ConnectionError, self.api.users(5).delete)
+        self.assertEqual(self.cache.snapshot()["entries"], 0)
+
+    def test_cache_control(self):
+        def request(method, url, **kwargs):
+            r = self._request(method, url, **kwargs)
+            r.headers["cache-control"] = cache_control
+            return r
+
+        self.session.request.side_effect = request
+        for cache_control in ("no-store", "private, max-age=60", "no-cache", "max-age=0"):
+            self.api.users(5).get()
+        self.assertEqual(self.cache.snapshot()["entries"], 0)
+
+        cache_control = "max-age=5"
+        with mock.patch("time.time", return_value=1000.0):
+            self.api.users(5).get()
+        with mock.patch("time.time", return_value=1006.0):
+            self.api.users(5).get()
+        self.assertEqual(self.session.request.call_count, 6)
+
+    def test_conditional_request(self):
+        self.api.users.get()
+        resp = self.api.users._request("GET", headers={"If-None-Match": '"v1"'})
+
+        self.assertEqual(self.session.request.call_count, 2)
+        self.assertEqual(self.session.request.call_args[1]["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_eviction(self):
+        cache = ObjectCache(max_entries=2)
+        for url in ("http://a/1/", "http://a/2/", "http://a/3/"):
+            cache.set(url, None, 200, "application/json", b"{}")
+        self.assertEqual(cache.get("http://a/1/"), None)
+        self.assertEqual(cache.get("http://a/3/"), (200, "application/json", b"{}"))
+
+        cache = ObjectCache(max_bytes=10)
+        cache.set("http://a/1/", None, 200, "application/json", b"123456")
+        cache.set("http://a/2/", None, 200, "application/json", b"123456")
+        self.assertEqual(cache.snapshot()["evictions"], 1)
+        self.assertEqual(cache.snapshot()["bytes"], 6)
+
+    def test_expiry(self):
+        cache = ObjectCache(ttl=-1)
+        cache.set("http://a/1/", None, 200, "application/json", b"{}")
+        self.assertEqual(cache.get("http://a/1/"), None)
+        self.assertEqual(cache.snapshot()["entries"], 0)
@@ -0,0 +1,110 @@
+import array
+import json
+import math
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import exceptions
+from slumber.columns import decode_columns
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ROWS = [
+    {"id": 1, "price": 1.5, "name": "a", "owner": {"id": 7, "tags": [{"x": 1}]}},
+    {"id": 2, "price": None, "name": "b", "extra": True},
+    {"id": 3, "price": 3, "owner": None},
+]
+
+SCHEMA = [("id", "q"), ("price", "d"), ("name", None), ("owner", None)]
+
+
+class ColumnsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock(spec=requests.Session)
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session)
+
+    def _respond(self, content, content_type="application/json"):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": content_type}
+        r.content = content
+        r.iter_lines.return_value = iter(content.splitlines())
+        self.session.request.return_value = r
+
+    def _check(self, columns):
+        self.assertEqual(list(columns), ["id", "price", "name", "owner"])
+        self.assertEqual(columns["id"], array.array("q", [1, 2, 3]))
+        self.assertEqual(columns["price"][0], 1.5)
+        self.assertTrue(math.isnan(columns["price"][1]))
+        self.assertEqual(columns["price"][2], 3.0)
+        self.assertEqual(columns["name"], ["a", "b", None])
+        self.assertEqual(columns["owner"], [{"id": 7, "tags": [{"x": 1}]}, None, None])
+
+    def test_json(self):
+        self._respond(json.dumps(ROWS).encode("utf-8"))
+        self._check(self.api.items.get(_as="columns", _columns=SCHEMA))
+
+        self._respond(json.dumps({"meta": {"next": None}, "objects": ROWS}).encode("utf-8"))
+        self._check(self.api.items.get(_as="columns", _columns=SCHEMA, limit=3))
+        self.assertEqual(self.session.request.call_args[1]["params"], {"limit": 3})
+
+    def test_ndjson(self):
+        content = "\n".join(json.dumps(row) for row in ROWS).encode("utf-8") + b"\n"
+        self._respond(content, "application/x-ndjson")
+        self._check(self.api.items.get(_as="columns", _columns=SCHEMA))
+
+        self._respond(content, "application/x-ndjson")
+        self._check(self.api.items.get(_as="columns", _columns=SCHEMA, _stream=True))
+        self.assertTrue(self.session.request.return_value.iter_lines.called)
+
+    def test_schema(self):
+        columns = decode_columns(["id"], content=b'[{"id": 1}, {"id": "2"}]')
+        self.assertEqual(columns, {"id": [1, "2"]})
+
+        columns = decode_columns({"id": "q"}, data=[{"id": 1}, {"id": 2}])
+        self.assertEqual(columns, {"id": array.array("q", [1, 2])})
+
+        self.assertRaises(ValueError, decode_columns, {"id": "q"}, content=b'[{"id": null}]')
+        self.assertRaises(exceptions.ImproperlyConfigured, decode_columns, {"id": "q"}, content=b'{"id": 1}')
+
+    def test_chunks(self):
+        rows = [{"id": i, "note": "}, {" * (i % 3), "nested": [{"a": {"b": i}}, {"c": None}]} for i in range(200)]
+        schema = [("id", "q"), ("note", None), ("nested", None)]
+        expected = {"id": array.array("q", range(200)), "note": [row["note"] for row in rows],
+                    "nested": [row["nested"] for row in rows]}
+
+        with mock.patch("slumber.columns.CHUNK_SIZE", 50), mock.patch("slumber.columns.CHUNK_LINES", 7):
+            for separators in [(",", ":"), (", ", ": ")]:
+                content = json.dumps({"objects": rows, "meta": {"next": None}}, separators=separators)
+                self.assertEqual(decode_columns(schema, content=content), expected)
+                self.assertEqual(decode_columns(schema, content=json.dumps(rows, indent=2)), expected)
+
+            lines = [json.dumps(row) for row in rows]
+            lines[10:10] = ["", " "]
+            self.assertEqual(decode_columns(schema, content="\n".join(lines), ndjson=True), expected)
+            self.assertEqual(decode_columns(schema, lines=[line.encode("utf-8") for line in lines]), expected)
+
+        self.assertEqual(decode_columns(schema, content=b"[]"), {"id": array.array("q"), "note": [], "nested": []})
+        self.assertRaises(ValueError, decode_columns, schema, content='[{"id": 1},]')
+        self.assertRaises(ValueError, decode_columns, schema, content='[{"id": 1}')
+
+    def test_invalid(self):
+        self._respond(b"[]")
+        self.assertRaises(exceptions.ImproperlyConfigured, self.api.items.get, _as="rows", _columns=SCHEMA)
+        self.assertRaises(exceptions.ImproperlyConfigured, self.api.items.get, _as="columns")
+        self.assertFalse(self.session.request.called)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy(self):
+        self._respond(json.dumps(ROWS).encode("utf-8"))
+        columns = self.api.items.get(_as="numpy", _columns=SCHEMA)
+        self.assertEqual(columns["id"].dtype, numpy.int64)
+        self.assertEqual(columns["id"].tolist(), [1, 2, 3])
+        self.assertEqual(columns["name"].dtype, object)
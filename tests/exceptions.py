@@ -0,0 +1,98 @@
+import pickle
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from urllib3.exceptions import EmptyPoolError, MaxRetryError, NewConnectionError, ProtocolError
+
+from slumber import exceptions
+
+
+class ExceptionsTestCase(unittest.TestCase):
+
+    def _connection_error(self, reason):
+        return requests.ConnectionError(MaxRetryError(None, "/", reason))
+
+    def test_classify(self):
+        refused = NewConnectionError(None, "Failed to establish a new connection: [Errno 111] Connection refused")
+        unresolved = NewConnectionError(None, "Failed to resolve 'nowhere.invalid' ([Errno -2] Name or service "
+                                              "not known)")
+        cases = [
+            (self._connection_error(refused), exceptions.ConnectError),
+            (self._connection_error(unresolved), exceptions.DNSError),
+            (requests.ConnectionError(ProtocolError("Connection aborted.")), exceptions.ReadError),
+            (requests.ConnectionError(), exceptions.ReadError),
+            (requests.ConnectTimeout(), exceptions.ConnectTimeout),
+            (requests.ReadTimeout(), exceptions.ReadTimeout),
+            (requests.exceptions.SSLError(), exceptions.TLSError),
+            (requests.exceptions.ChunkedEncodingError(), exceptions.ReadError),
+            (EmptyPoolError(None, "No pool connections are available."), exceptions.PoolExhausted),
+            (requests.exceptions.InvalidURL(), exceptions.TransportError),
+        ]
+        for exc, cls in cases:
+            self.assertTrue(exceptions.classify(exc) is cls, "%r should be a %s" % (exc, cls.__name__))
+
+    def test_transport_error(self):
+        original = requests.ReadTimeout("timed out", request="request")
+        error = exceptions.transport_error(original, idempotent=True)
+
+        self.assertIsInstance(error, exceptions.ReadTimeout)
+        self.assertIsInstance(error, requests.ReadTimeout)
+        self.assertTrue(error.original is original)
+        self.assertEqual(error.request, "request")
+        self.assertEqual(str(error), "timed out")
+        self.assertTrue(error.retryable)
+        self.assertTrue(error.request_sent)
+        self.assertFalse(exceptions.transport_error(original).retryable)
+
+        connect = exceptions.transport_error(requests.ConnectTimeout())
+        self.assertTrue(connect.retryable)
+        self.assertFalse(connect.request_sent)
+        self.assertTrue(exceptions.transport_error(connect) is connect)
+
+    def test_pickle(self):
+        original = requests.ConnectionError("connection dropped")
+        error = pickle.loads(pickle.dumps(exceptions.transport_error(original, idempotent=True)))
+
+        self.assertIsInstance(error, exceptions.ReadError)
+        self.assertIsInstance(error, requests.ConnectionError)
+        self.assertTrue(type(error) is type(exceptions.transport_error(original)))
+        self.assertEqual(error.args, ("connection dropped",))
+        self.assertTrue(error.retryable)
+        self.assertEqual(str(error.original), "connection dropped")
+
+    def test_raised(self):
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = requests.ConnectTimeout()
+        client = slumber.API(base_url="http://example/api/v1", session=session)
+
+        with self.assertRaises(exceptions.ConnectTimeout):
+            client.users.get()
+        with self.assertRaises(requests.ConnectTimeout):
+            client.users.get()
+
+    def test_lazy_content(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 503
+        r.headers = {}
+        content = mock.PropertyMock(return_value=b"unavailable")
+        type(r).content = content
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+        client = slumber.API(base_url="http://example/api/v1", session=session)
+
+        # A streamed error body is left unread unless someone asks for it
+        with self.assertRaises(exceptions.HttpServerError) as context:
+            client.users.get(_stream=True)
+        self.assertEqual(content.call_count, 0)
+        self.assertTrue(context.exception.retryable)
+        self.assertEqual(context.exception.content, b"unavailable")
+        self.assertEqual(context.exception.content, b"unavailable")
+        self.assertEqual(content.call_count, 1)
+
+        error = exceptions.HttpClientError("Client Error", response=r, content=b"given")
+        self.assertEqual(error.content, b"given")
+        self.assertFalse(exceptions.HttpClientError("Client Error").retryable)
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.hedging import HedgePolicy
+from slumber.metrics import Histogram
+
+
+class HedgingTestCase(unittest.TestCase):
+
+    def _response(self, content):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = content
+        return r
+
+    def test_get_delay(self):
+        policy = HedgePolicy(min_samples=10)
+        histogram = Histogram()
+        self.assertEqual(policy.get_delay(histogram), None)
+        for _ in range(10):
+            histogram.record(0.02)
+        self.assertAlmostEqual(policy.get_delay(histogram), 0.02, delta=0.001)
+        self.assertEqual(HedgePolicy(delay=0.5).get_delay(None), 0.5)
+
+    def test_hedge_wins(self):
+        release = threading.Event()
+        slow = self._response(b'{"from": "slow"}')
+        fast = self._response(b'{"from": "fast"}')
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                release.wait(5)
+                return slow
+            return fast
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = request
+        policy = HedgePolicy(delay=0.01, max_ratio=1)
+
+        client = slumber.API(base_url=["http://a/api/v1/", "http://b/api/v1/"], session=session, hedge=policy)
+        self.assertEqual(client.test.get(), {"from": "fast"})
+        release.set()
+
+        self.assertEqual(calls, ["http://a/api/v1/test/", "http://b/api/v1/test/"])
+        self.assertEqual(policy.snapshot(), {"requests": 1, "hedged": 1, "won": 1, "wasted": 0})
+
+    def test_writes_not_hedged(self):
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(method)
+            time.sleep(0.05)
+            return self._response(b"{}")
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = request
+        client = slumber.API(base_url="http://a/api/v1/", session=session, idempotency_header="Idempotency-Key",
+                             hedge=HedgePolicy(delay=0.01, max_ratio=1))
+
+        client.test(1).put(data={"name": "x"})
+        client.test(1).delete()
+        self.assertEqual(calls, ["PUT", "DELETE"])
+
+        del calls[:]
+        client.test(1).put(data={"name": "x"}, _idempotency_key="abc")
+        self.assertEqual(calls, ["PUT", "PUT"])
+
+    def test_no_worker_limit(self):
+        # More concurrent requests than the old pool size all run at once
+        policy = HedgePolicy(delay=10, max_ratio=1)
+        lock = threading.Lock()
+        everyone = threading.Event()
+        results = []
+
+        def send():
+            with lock:
+                results.append(None)
+                if len(results) == 20:
+                    everyone.set()
+            everyone.wait(5)
+            return self._response(b"{}")
+
+        threads = [threading.Thread(target=policy.run, args=(send, 10)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(everyone.is_set())
+
+    def test_calling_thread(self):
+        policy = HedgePolicy(delay=0.01, max_ratio=0)
+        threads = []
+
+        def send():
+            threads.append(threading.current_thread())
+            return self._response(b"{}")
+
+        policy.run(send, 0.01)
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(policy._executor, None)
+
+    def test_max_hedges(self):
+        policy = HedgePolicy(max_ratio=1, max_hedges=1)
+        policy.requests = 10
+        self.assertTrue(policy._allow())
+        self.assertFalse(policy._allow())
+        policy._release(None)
+        self.assertTrue(policy._allow())
+
+    def test_budget(self):
+        policy = HedgePolicy(delay=0, max_ratio=0.1)
+        policy.requests = 5
+        self.assertFalse(policy._allow())
+        policy.requests = 10
+        self.assertTrue(policy._allow())
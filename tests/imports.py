@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import unittest2 as unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for slow CI machines, far below the cost of importing
+# requests and pyyaml eagerly.
+IMPORT_BUDGET = 0.1
+
+
+class ImportTestCase(unittest.TestCase):
+
+    def _run(self, snippet):
+        output = subprocess.check_output([sys.executable, "-c", snippet], cwd=BASE_DIR)
+        return output.decode("ascii").strip()
+
+    def test_import_is_lazy(self):
+        loaded = self._run("import sys, slumber; "
+                           "print(','.join(m for m in ('requests', 'yaml', 'inspect') if m in sys.modules))")
+        self.assertEqual(loaded, "")
+
+    def test_import_budget(self):
+        timings = [float(self._run("import time; t = time.time(); import slumber; print(time.time() - t)"))
+                   for _ in range(3)]
+        self.assertLess(min(timings), IMPORT_BUDGET)
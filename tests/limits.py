@@ -0,0 +1,141 @@
+import threading
+import time
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import exceptions
+from slumber.limits import ConcurrencyLimiter, AIMDLimit, GradientLimit
+
+
+class LimitsTestCase(unittest.TestCase):
+
+    def _queue(self, limiter, priority, host, order):
+        def run():
+            with limiter.slot(priority, host):
+                order.append(priority)
+        thread = threading.Thread(target=run)
+        thread.start()
+        # Wait until the request is queued, so arrival order is deterministic
+        while limiter.snapshot()["queue_depth"] < self._queued + 1:
+            time.sleep(0.001)
+        self._queued += 1
+        return thread
+
+    def setUp(self):
+        self._queued = 0
+
+    def test_priority_order(self):
+        limiter = ConcurrencyLimiter(max_in_flight=1)
+        order = []
+
+        limiter.acquire()
+        threads = [self._queue(limiter, priority, None, order)
+                   for priority in ("bulk", "default", "interactive", "bulk")]
+        self.assertEqual(limiter.snapshot()["queue_depth"], 4)
+        limiter.release()
+
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, ["interactive", "default", "bulk", "bulk"])
+
+        snapshot = limiter.snapshot()
+        self.assertEqual(snapshot["in_flight"], 0)
+        self.assertEqual(snapshot["max_queue_depth"], 4)
+        self.assertEqual(snapshot["wait_time"]["bulk"]["count"], 2)
+
+    def test_per_host(self):
+        limiter = ConcurrencyLimiter(max_in_flight=10, per_host=1)
+        order = []
+
+        limiter.acquire("default", "a")
+        thread = self._queue(limiter, "interactive", "a", order)
+        # A request for another host isn't held up by the full host
+        limiter.acquire("bulk", "b")
+        limiter.release("b")
+
+        limiter.release("a")
+        thread.join(5)
+        self.assertEqual(order, ["interactive"])
+
+    def test_aimd_limit(self):
+        limit = AIMDLimit(initial=10, backoff=0.5)
+        for _ in range(5):
+            limit.update(0.01, in_flight=10)
+        self.assertEqual(limit.limit, 15)
+
+        limit.update(0.01, in_flight=1)
+        self.assertEqual(limit.limit, 15)
+
+        limit.update(0.05, in_flight=15)
+        self.assertEqual(limit.limit, 7)
+        limit.update(0.01, in_flight=7, dropped=True)
+        self.assertEqual(limit.limit, 3)
+
+    def test_gradient_limit(self):
+        limit = GradientLimit(initial=20, tolerance=1.0)
+        for _ in range(50):
+            limit.update(0.01, in_flight=20)
+        grown = limit.limit
+        self.assertGreater(grown, 20)
+
+        for _ in range(20):
+            limit.update(0.1, in_flight=grown)
+        self.assertLess(limit.limit, grown)
+
+    def test_zero_rtt(self):
+        limit = GradientLimit(initial=20)
+        limit.update(0.0, in_flight=20)
+        limit.update(0.0, in_flight=20)
+        self.assertGreaterEqual(limit.limit, 20)
+
+        limit = AIMDLimit(initial=10)
+        limit.update(0.0, in_flight=10)
+        limit.update(0.0015, in_flight=10)
+        self.assertEqual(limit.limit, 12)
+
+    def test_failing_limit(self):
+        adaptive = mock.Mock(limit=1)
+        adaptive.update.side_effect = ValueError()
+        limiter = ConcurrencyLimiter(max_in_flight=adaptive)
+
+        for _ in range(2):
+            self.assertRaises(ValueError, limiter.call, lambda: mock.Mock(status_code=200))
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(adaptive.update.call_args[0][1], 1)
+
+    def test_adaptive_limiter(self):
+        limiter = ConcurrencyLimiter(max_in_flight=AIMDLimit(initial=4, backoff=0.5))
+        overloaded = mock.Mock(status_code=503)
+
+        self.assertTrue(limiter.call(lambda: overloaded) is overloaded)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.snapshot()["limit"], 2)
+
+        with self.assertRaises(requests.ConnectionError):
+            limiter.call(mock.Mock(side_effect=requests.ConnectionError()))
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_invalid_priority(self):
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            ConcurrencyLimiter().acquire("urgent")
+
+    def test_api_priority(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 1}'
+
+        limiter = ConcurrencyLimiter(max_in_flight=2)
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+
+        client = slumber.API(base_url="http://example/api/v1", session=session, limiter=limiter)
+        with mock.patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire:
+            self.assertEqual(client.users(1).get(_priority="interactive"), {"id": 1})
+        acquire.assert_called_once_with("interactive", "example")
+        self.assertEqual(session.request.call_args[1]["params"], {})
+        self.assertEqual(limiter.snapshot()["in_flight"], 0)
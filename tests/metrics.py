@@ -0,0 +1,76 @@
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import exceptions
+from slumber.metrics import Histogram, get_registry, normalize_path
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def test_histogram(self):
+        h = Histogram()
+        for ms in range(1, 101):
+            h.record(ms / 1000.0)
+
+        snapshot = h.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["min"], 0.001)
+        self.assertEqual(snapshot["max"], 0.1)
+        self.assertAlmostEqual(h.percentile(50), 0.05, delta=0.05 / 64)
+        self.assertAlmostEqual(h.percentile(99), 0.099, delta=0.099 / 64)
+        self.assertEqual(Histogram().percentile(50), None)
+
+    def test_normalize_path(self):
+        self.assertEqual(normalize_path("http://example/api/v1/users/12/posts/"), "/api/v1/users/{id}/posts/")
+        self.assertEqual(normalize_path("http://example/users/3f2504e0-4f89-11d3-9a0c-0305e82c3301"),
+                         "/users/{id}")
+
+    def test_api_metrics(self):
+        ok = mock.Mock(spec=requests.Response)
+        ok.status_code = 200
+        ok.headers = {"content-type": "application/json"}
+        ok.content = b'{"id": 5}'
+
+        missing = mock.Mock(spec=requests.Response)
+        missing.status_code = 404
+        missing.headers = {}
+        missing.content = b''
+
+        client = slumber.API(base_url="http://example/api/v1/", session=mock.Mock(spec=requests.Session))
+        client.users._store["session"].request.side_effect = (ok, missing, requests.ConnectionError())
+
+        client.users(5).get()
+        with self.assertRaises(exceptions.HttpNotFoundError):
+            client.users(6).get()
+        with self.assertRaises(requests.ConnectionError):
+            client.users(7).posts.post(data={"title": "x"})
+
+        snapshot = get_registry(client).snapshot()
+        users = snapshot["GET /api/v1/users/{id}/"]
+        self.assertEqual(users["requests"], 2)
+        self.assertEqual(users["errors"], {"HttpClientError": 1})
+        self.assertEqual(users["bytes_in"], len(ok.content))
+        self.assertEqual(users["latency"]["count"], 2)
+
+        posts = snapshot["POST /api/v1/users/{id}/posts/"]
+        self.assertEqual(posts["errors"], {"transport": 1})
+        self.assertEqual(posts["bytes_out"], len('{"title": "x"}'))
+
+    def test_api_metrics_disabled(self):
+        client = slumber.API(base_url="http://example/api/v1/", metrics=False)
+        self.assertEqual(get_registry(client), None)
+
+    def test_metrics_resource(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"uptime": 5}'
+
+        client = slumber.API(base_url="http://example/api/v1/", session=mock.Mock(spec=requests.Session))
+        client.metrics._store["session"].request.return_value = r
+
+        self.assertEqual(client.metrics.get(), {"uptime": 5})
+        self.assertEqual(client.metrics._store["session"].request.call_args[0][1],
+                         "http://example/api/v1/metrics/")
@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import process
+from slumber.metrics import get_registry
+from slumber.process import SharedCache
+
+
+class ProcessTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_reset_session(self):
+        session = requests.Session()
+        adapter = session.get_adapter("http://example/")
+        poolmanager = adapter.poolmanager
+
+        process.reset_session(session)
+
+        self.assertFalse(adapter.poolmanager is poolmanager)
+        self.assertEqual(adapter._pool_maxsize, adapter.poolmanager.connection_pool_kw["maxsize"])
+
+    def test_fork_handlers(self):
+        session = requests.Session()
+        handler = mock.Mock()
+        process.register_fork_handler(session, handler)
+
+        with mock.patch.object(process, "_PID", -1):
+            process.check_fork()
+
+        handler.assert_called_once_with(session)
+        self.assertEqual(process._PID, os.getpid())
+
+    def test_api_fork_handlers(self):
+        class Limiter(object):
+            # A limiter of its own, without _after_fork
+            def call(self, send, priority=None, host=None):
+                return send()
+
+        session = self._session()
+        client = slumber.API(base_url=["http://a/api/v1/", "http://b/api/v1/"], session=session, limiter=Limiter())
+        client.users.get()
+        pool = client._store["pool"]
+        pool.acquire()
+        self.assertEqual(sum(e.outstanding for e in pool.endpoints), 1)
+
+        with mock.patch.object(process, "_PID", -1):
+            process.check_fork()
+
+        self.assertEqual(get_registry(client).snapshot(), {})
+        self.assertEqual(sum(e.outstanding for e in pool.endpoints), 0)
+
+    def test_shared_cache(self):
+        cache = SharedCache(self.path, slots=4, slot_size=256, ttl=60)
+        self.assertEqual(cache.get("a"), None)
+        self.assertTrue(cache.set("a", 200, "application/json", b'{"a": 1}'))
+        self.assertFalse(cache.set("b", 200, "application/json", b"x" * 256))
+
+        other = SharedCache(self.path, slots=4, slot_size=256)
+        self.assertEqual(other.get("a"), (200, "application/json", b'{"a": 1}'))
+
+        cache.delete("a")
+        self.assertEqual(other.get("a"), None)
+
+        cache.set("c", 200, "application/json", b"{}", ttl=-1)
+        self.assertEqual(cache.get("c"), None)
+        other.close()
+        cache.close()
+
+    def test_api_shared_cache(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 1}'
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+        cache = SharedCache(self.path, slots=16, slot_size=1024)
+
+        client = slumber.API(base_url="http://example/api/v1", session=session, shared_cache=cache)
+        self.assertEqual(client.countries(1).get(), {"id": 1})
+        self.assertEqual(client.countries(1).get(), {"id": 1})
+        self.assertEqual(session.request.call_count, 1)
+
+        client.countries(1).get(lang="de")
+        self.assertEqual(session.request.call_count, 2)
+        cache.close()
+
+    def _session(self, headers=None):
+        session = mock.Mock(spec=requests.Session)
+        session.auth = None
+        session.headers = {}
+        session.cookies = requests.cookies.RequestsCookieJar()
+
+        def request(method, url, **kwargs):
+            r = mock.Mock(spec=requests.Response)
+            r.status_code = 200 if method == "GET" else 202
+            r.headers = dict(headers or {}, **{"content-type": "application/json"})
+            r.content = ('{"calls": %s}' % session.request.call_count).encode("utf-8")
+            return r
+
+        session.request.side_effect = request
+        return session
+
+    def test_shared_cache_invalidation(self):
+        cache = SharedCache(self.path, slots=64, slot_size=1024)
+        session = self._session()
+        client = slumber.API(base_url="http://example/api/v1/", session=session, shared_cache=cache)
+
+        client.users.get()
+        client.users(1).get()
+        client.users(2).get()
+        self.assertEqual(session.request.call_count, 3)
+
+        client.users(1).put(data={"name": "x"})
+        self.assertEqual(client.users(1).get(), {"calls": 5})
+        self.assertEqual(client.users.get(), {"calls": 6})
+        self.assertEqual(client.users(2).get(), {"calls": 3})
+        cache.close()
+
+    def test_shared_cache_control(self):
+        cache = SharedCache(self.path, slots=64, slot_size=1024, ttl=60)
+        for value in ["no-store", "private, max-age=60", "no-cache", "max-age=0"]:
+            session = self._session({"Cache-Control": value})
+            client = slumber.API(base_url="http://example/api/v1/", session=session, shared_cache=cache)
+            client.users.get()
+            client.users.get()
+            self.assertEqual(session.request.call_count, 2)
+
+        self.assertEqual(process.cache_ttl({"cache-control": "public, max-age=5"}, 60), 5)
+        self.assertEqual(process.cache_ttl({"Cache-Control": "max-age=600"}, 60), 60)
+        self.assertEqual(process.cache_ttl({}, 60), 60)
+        cache.close()
+
+    def test_shared_cache_conditional(self):
+        cache = SharedCache(self.path, slots=64, slot_size=1024)
+        session = self._session()
+        client = slumber.API(base_url="http://example/api/v1/", session=session, shared_cache=cache)
+
+        client.users.get()
+        client.users._request("GET", headers={"If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"})
+        self.assertEqual(session.request.call_count, 2)
+        self.assertTrue(process.is_conditional({"If-None-Match": '"v1"'}))
+        self.assertFalse(process.is_conditional({"Accept": "application/json"}))
+        cache.close()
+
+    def test_shared_cache_credentials(self):
+        cache = SharedCache(self.path, slots=64, slot_size=1024)
+        sessions = [self._session() for _ in range(4)]
+        clients = [slumber.API(base_url="http://example/api/v1/", session=session, shared_cache=cache)
+                   for session in sessions]
+        sessions[0].auth = sessions[1].auth = ("alice", "secret")
+        sessions[2].auth = ("bob", "secret")
+        sessions[3].headers = {"Authorization": "Token abc"}
+
+        for client in clients:
+            client.users.get()
+        self.assertEqual([session.request.call_count for session in sessions], [1, 0, 1, 1])
+
+        sessions[1].cookies.set("sessionid", "123")
+        clients[1].users.get()
+        self.assertEqual(sessions[1].request.call_count, 1)
+
+        self.assertEqual(process.credentials_key(self._session()), "")
+        self.assertNotEqual(process.credentials_key(sessions[0]), process.credentials_key(sessions[2]))
+        cache.close()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber import exceptions
+from slumber.recording import RecordingSession, ReplaySession
+
+
+class RecordingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "traffic.rec")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _response(self, status_code, content):
+        r = requests.Response()
+        r.status_code = status_code
+        r.headers["content-type"] = "application/json"
+        r._content = content
+        r.url = "http://example/api/v1/test/"
+        return r
+
+    def test_record_and_replay(self):
+        session = RecordingSession(self.path)
+        responses = [self._response(200, b'{"page": 1}'), self._response(201, b'{"id": 7}')]
+
+        with mock.patch.object(requests.Session, "request", side_effect=responses):
+            api = slumber.API("http://example/api/v1/", session=session)
+            self.assertEqual(api.test.get(page=1), {"page": 1})
+            self.assertEqual(api.test.post(data={"name": "x"}), {"id": 7})
+        session.close()
+
+        replay = ReplaySession(self.path)
+        self.assertEqual(len(replay), 2)
+
+        api = slumber.API("http://example/api/v1/", session=replay)
+        self.assertEqual(api.test.get(page=1), {"page": 1})
+        self.assertEqual(api.test.post(data={"name": "x"}), {"id": 7})
+        self.assertEqual(api.status_code, 201)
+
+        with self.assertRaises(exceptions.RecordingNotFound):
+            api.test.get(page=2)
+        replay.close()
+
+    def test_replay_empty(self):
+        open(self.path, "wb").close()
+
+        replay = ReplaySession(self.path)
+        self.assertEqual(len(replay), 0)
+        replay.close()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import sys
+import time
 import mock
 import requests
 import slumber
@@ -7,6 +8,8 @@ import slumber.serialize
 import unittest2 as unittest
 
 from slumber import exceptions
+from slumber.hedging import HedgePolicy
+from slumber.metrics import get_registry
 
 
 class ResourceTestCase(unittest.TestCase):
@@ -480,6 +483,29 @@ class ResourceTestCase(unittest.TestCase):
     def test_url(self):
         self.assertEqual(self.base_resource.url(), "http://example/api/v1/test")
 
+    def test_call_url(self):
+        client = slumber.API(base_url="http://example/api/v1")
+
+        self.assertEqual(client.test(5).url(), "http://example/api/v1/test/5/")
+        self.assertEqual(client.test(res_format="yaml").url(), "http://example/api/v1/test/")
+        self.assertEqual(client.test(res_format="yaml")._store["format"], "yaml")
+
+    def test_res_format_serializer(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 204
+        r.headers = {}
+        r.content = ""
+
+        client = slumber.API(base_url="http://example/api/v1",
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+        client.test(res_format="yaml").post(data={"foo": "bar"})
+
+        args, kwargs = client.test._store["session"].request.call_args
+        self.assertEqual(kwargs["headers"]["content-type"], "text/yaml")
+        self.assertEqual(kwargs["headers"]["accept"], "text/yaml")
+        self.assertEqual(kwargs["data"], slumber.serialize.YamlSerializer().dumps({"foo": "bar"}))
+
     def test_get_200_json_py3(self):
         r = mock.Mock(spec=requests.Response)
         r.status_code = 200
@@ -559,3 +585,334 @@ class ResourceTestCase(unittest.TestCase):
         resp = self.base_resource.post(data={'foo': 'bar'})
         expected = b'Pr\xc3\xa9paratoire'.decode('utf8')
         self.assertEqual(resp['result'], expected)
+
+    def test_get_200_lazy(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"result": ["a", "b", "c"]}'
+
+        self.base_resource._store.update({
+            "session": mock.Mock(spec=requests.Session),
+            "serializer": slumber.serialize.Serializer(),
+        })
+        self.base_resource._store["session"].request.return_value = r
+
+        resp = self.base_resource.get(_lazy=True)
+
+        self.assertIsInstance(resp, slumber.LazyResponse)
+        self.assertFalse(resp.loaded)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content is r.content)
+
+        self.assertEqual(resp['result'], ['a', 'b', 'c'])
+        self.assertTrue(resp.loaded)
+        self.assertEqual(resp.content, None)
+        self.assertEqual(list(resp), ['result'])
+
+        self.base_resource._store["session"].request.assert_called_once_with(
+            "GET",
+            "http://example/api/v1/test",
+            data=None,
+            files=None,
+            params={},
+            headers={"content-type": self.base_resource._store["serializer"].get_content_type(),
+                     "accept": self.base_resource._store["serializer"].get_content_type()}
+        )
+
+    def test_api_lazy_204(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 204
+        r.headers = {}
+        r.content = b''
+
+        client = slumber.API(base_url="http://example/api/v1", lazy=True,
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+        resp = client.test.delete()
+
+        self.assertIsInstance(resp, slumber.LazyResponse)
+        self.assertEqual(resp.data, None)
+
+    def test_get_fields(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"meta": {"next": null, "total_count": 1}, "objects": [{"id": 1, "name": "a"}]}'
+
+        client = slumber.API(base_url="http://example/api/v1",
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+        resp = client.test.get(_fields=["meta.next", "objects[].id"], limit=1)
+
+        self.assertEqual(resp, {"meta": {"next": None}, "objects": [{"id": 1}]})
+        self.assertEqual(client.test._store["session"].request.call_args[1]["params"],
+                         {"limit": 1, "fields": "meta.next,objects.id"})
+
+    def test_get_fields_no_param(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'[{"id": 1, "name": "a"}]'
+
+        client = slumber.API(base_url="http://example/api/v1", fields_param=None,
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+        resp = client.test.get(_fields=["name"])
+
+        self.assertEqual(resp, [{"name": "a"}])
+        self.assertEqual(client.test._store["session"].request.call_args[1]["params"], {})
+
+    def test_decode_as(self):
+        import collections
+
+        User = collections.namedtuple("User", ["id", "name"])
+
+        class Post(object):
+            __slots__ = ("id", "title")
+
+        r1 = mock.Mock(spec=requests.Response)
+        r1.status_code = 200
+        r1.headers = {"content-type": "application/json"}
+        r1.content = b'{"meta": {"next": null}, "objects": [{"id": 1, "name": "a", "extra": true}]}'
+
+        r2 = mock.Mock(spec=requests.Response)
+        r2.status_code = 200
+        r2.headers = {"content-type": "application/json"}
+        r2.content = b'{"id": 2, "name": "b"}'
+
+        r3 = mock.Mock(spec=requests.Response)
+        r3.status_code = 200
+        r3.headers = {"content-type": "application/json"}
+        r3.content = b'[{"id": 3, "title": "c"}]'
+
+        client = slumber.API(base_url="http://example/api/v1",
+                             session=mock.Mock(spec=requests.Session))
+        client.users.decode_as(User)
+        client.posts.decode_as(Post)
+        client.users._store["session"].request.side_effect = (r1, r2, r3)
+
+        resp = client.users.get()
+        self.assertEqual(resp["meta"], {"next": None})
+        self.assertEqual(resp["objects"], [User(id=1, name="a")])
+
+        self.assertEqual(client.users(2).get(), User(id=2, name="b"))
+
+        posts = client.posts.get()
+        self.assertIsInstance(posts[0], Post)
+        self.assertEqual((posts[0].id, posts[0].title), (3, "c"))
+
+    def test_decode_as_children(self):
+        import collections
+
+        User = collections.namedtuple("User", ["id", "name"])
+
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 2, "name": "b"}'
+
+        client = slumber.API(base_url="http://example/api/v1",
+                             session=mock.Mock(spec=requests.Session))
+        client.users.decode_as(User)
+        client.users._store["session"].request.return_value = r
+
+        self.assertEqual(client.users(2).get(), User(id=2, name="b"))
+        self.assertEqual(client.compile("users/{uid}").get(uid=2), User(id=2, name="b"))
+        self.assertEqual(client.users.search.get(), {"id": 2, "name": "b"})
+        self.assertEqual(client.users(2).posts.get(), {"id": 2, "name": "b"})
+        self.assertEqual(client.compile("users/{uid}/posts").get(uid=2), {"id": 2, "name": "b"})
+
+    def test_decode_as_missing_fields(self):
+        import collections
+        from slumber.records import RecordDecoder
+
+        User = collections.namedtuple("User", ["id", "name", "active"])
+        User.__new__.__defaults__ = ("anonymous", True)  # namedtuple(defaults=...) before Python 3.7
+        self.assertEqual(RecordDecoder(User)({"id": 1, "active": None}), User(id=1, name="anonymous", active=None))
+
+        class Post(object):
+            __slots__ = ("id", "title")
+
+            def __init__(self, id, title="untitled"):
+                self.id = id
+                self.title = title
+
+        post = RecordDecoder(Post)({"title": "a"})
+        self.assertEqual((post.id, post.title), (None, "a"))
+        self.assertEqual(RecordDecoder(Post)({"id": 1}).title, "untitled")
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires dataclasses")
+    def test_decode_as_dataclass_missing_fields(self):
+        import dataclasses
+        from slumber.records import RecordDecoder
+
+        Post = dataclasses.make_dataclass("Post", ["id", ("title", str, dataclasses.field(default="untitled"))])
+        self.assertEqual(RecordDecoder(Post)({"title": "a"}), Post(id=None, title="a"))
+        self.assertEqual(RecordDecoder(Post)({"id": 1}), Post(id=1, title="untitled"))
+
+    def test_api_return_result(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json", "X-Request-Id": "abc"}
+        r.content = b'{"result": ["a", "b", "c"]}'
+
+        client = slumber.API(base_url="http://example/api/v1", return_result=True,
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+        test = client.test
+        resp = test.get()
+
+        self.assertIsInstance(resp, slumber.Result)
+        self.assertEqual(resp.data, {"result": ["a", "b", "c"]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["content-type"], "application/json")
+        self.assertEqual(resp.request_id, "abc")
+        self.assertTrue(resp.elapsed >= 0)
+
+        self.assertFalse(hasattr(client, "_status_code"))
+        self.assertFalse(hasattr(test, "_"))
+
+        self.assertEqual(client.test.get(_result=False), {"result": ["a", "b", "c"]})
+        self.assertEqual(client.status_code, 200)
+
+    def test_api_compile(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 1}'
+
+        client = slumber.API(base_url="http://example/api/v1",
+                             session=mock.Mock(spec=requests.Session))
+        client.test._store["session"].request.return_value = r
+
+        posts = client.compile("orgs/{org}/users/{uid}/posts")
+        self.assertEqual(posts.fields, ("org", "uid"))
+        self.assertEqual(posts.url(org="acme", uid=5), client.orgs("acme").users(5).posts.url())
+
+        self.assertEqual(posts.get(org="acme", uid=5, limit=10), {"id": 1})
+        self.assertEqual(client.test._store["session"].request.call_args[0],
+                         ("GET", "http://example/api/v1/orgs/acme/users/5/posts/"))
+        self.assertEqual(client.test._store["session"].request.call_args[1]["params"], {"limit": 10})
+
+        posts.post(org="acme", uid=5, data={"title": "x"})
+        self.assertEqual(client.test._store["session"].request.call_args[1]["data"], '{"title": "x"}')
+
+        self.assertIn("GET /api/v1/orgs/{org}/users/{uid}/posts/", get_registry(client).snapshot())
+
+        with self.assertRaises(TypeError):
+            posts.get(org="acme")
+
+    def test_idempotency_key(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 201
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 1}'
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = (requests.ConnectionError(), r, r, r, r)
+
+        client = slumber.API(base_url=["http://a/api/v1", "http://b/api/v1"], session=session,
+                             idempotency_header="Idempotency-Key")
+
+        self.assertEqual(client.test.post(data={"name": "x"}), {"id": 1})
+        first, retry = [c[1]["headers"] for c in session.request.call_args_list]
+        self.assertEqual(len(first["Idempotency-Key"]), 32)
+        self.assertEqual(first["Idempotency-Key"], retry["Idempotency-Key"])
+
+        client.test.post(data={"name": "x"})
+        self.assertNotEqual(session.request.call_args[1]["headers"]["Idempotency-Key"], first["Idempotency-Key"])
+
+        client.test(1).put(data={"name": "x"})
+        self.assertNotIn("Idempotency-Key", session.request.call_args[1]["headers"])
+
+        client.test(1).put(data={"name": "x"}, _idempotency_key="abc")
+        self.assertEqual(session.request.call_args[1]["headers"]["Idempotency-Key"], "abc")
+        self.assertEqual(session.request.call_args[1]["params"], {})
+
+    def test_ndjson_stream(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/x-ndjson", "content-length": "30"}
+        r.iter_lines.return_value = iter([b'{"id": 1, "name": "a"}', b'', b'{"id": 2, "name": "b"}'])
+        type(r).content = mock.PropertyMock(side_effect=AssertionError("body read at once"))
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+        client = slumber.API(base_url="http://example/api/v1", session=session)
+
+        rows = client.events.get(_stream=True, _fields=["id"])
+        self.assertEqual(session.request.call_args[1]["stream"], True)
+        self.assertEqual(next(rows), {"id": 1})
+        self.assertEqual(list(rows), [{"id": 2}])
+        self.assertEqual(get_registry(client).snapshot()["GET /api/v1/events/"]["bytes_in"], 30)
+
+    def test_ndjson_upload(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 204
+        r.headers = {}
+        r.content = b""
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+        client = slumber.API(base_url="http://example/api/v1", session=session)
+
+        client.events(res_format="ndjson").post(data=({"id": i} for i in range(2)))
+        self.assertEqual(session.request.call_args[0][1], "http://example/api/v1/events/")
+        kwargs = session.request.call_args[1]
+        self.assertEqual(kwargs["headers"]["content-type"], "application/x-ndjson")
+        self.assertEqual(b"".join(kwargs["data"]), b'{"id": 0}\n{"id": 1}\n')
+
+    def test_ndjson_upload_not_hedged(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 204
+        r.headers = {}
+        r.content = b""
+        bodies = []
+
+        def request(method, url, **kwargs):
+            bodies.append(b"".join(kwargs["data"]))
+            time.sleep(0.05)
+            return r
+
+        # A hedge would send the generator again, after it was used up
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = request
+        client = slumber.API(base_url="http://example/api/v1", session=session,
+                             hedge=HedgePolicy(delay=0.01, max_ratio=1), idempotency_header="Idempotency-Key")
+
+        client.events(res_format="ndjson").post(data=({"id": i} for i in range(2)))
+        self.assertEqual(bodies, [b'{"id": 0}\n{"id": 1}\n'])
+
+    def test_ndjson_upload_no_failover(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 204
+        r.headers = {}
+        r.content = b""
+
+        # Another endpoint would be sent the used up generator
+        session = mock.Mock(spec=requests.Session)
+        session.request.side_effect = (requests.ConnectionError(), r)
+        client = slumber.API(base_url=["http://a/api/v1", "http://b/api/v1"], session=session,
+                             idempotency_header="Idempotency-Key")
+
+        with self.assertRaises(exceptions.ReadError) as cm:
+            client.events(res_format="ndjson").post(data=({"id": i} for i in range(2)))
+        self.assertFalse(cm.exception.retryable)
+        self.assertEqual(session.request.call_count, 1)
+
+    def test_response_charset(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json; charset=ISO-8859-1"}
+        r.content = u'{"name": "Jürgen"}'.encode("latin-1")
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = r
+        client = slumber.API(base_url="http://example/api/v1", session=session)
+
+        self.assertEqual(client.users(1).get(), {"name": u"Jürgen"})
+
+        r.headers = {"content-type": "application/json; charset=utf-8"}
+        r.content = u'{"name": "Jürgen"}'.encode("utf-8")
+        self.assertEqual(client.users(1).get(), {"name": u"Jürgen"})
@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.metrics import get_registry
+
+OPENAPI = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "http://example/api/v1"}],
+    "paths": {
+        "/users/": {"get": {}, "post": {}},
+        "/users/{userId}/": {"get": {}, "delete": {}},
+        "/users/{userId}/posts/": {"get": {}},
+    },
+}
+
+TASTYPIE = {
+    "entry": {"list_endpoint": "/api/v1/entry/", "schema": "/api/v1/entry/schema/"},
+}
+
+
+class SchemaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _response(self, content):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = json.dumps(content).encode("utf-8")
+        return r
+
+    def test_openapi_file(self):
+        path = os.path.join(self.tmpdir, "openapi.json")
+        with open(path, "w") as fp:
+            json.dump(OPENAPI, fp)
+
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = self._response({"id": 1})
+        api = slumber.API.from_schema(path, session=session)
+
+        self.assertIn("users", dir(api))
+        self.assertEqual(api.users.allowed_methods, ("GET", "POST"))
+        self.assertEqual(api.users(1).allowed_methods, ("DELETE", "GET"))
+
+        with self.assertRaises(AttributeError):
+            api.usres
+        with self.assertRaises(AttributeError):
+            api.users.delete
+        with self.assertRaises(AttributeError):
+            api.users(1).comments
+        self.assertEqual(session.request.call_count, 0)
+
+        self.assertEqual(api.users(1).posts.get(limit=1), {"id": 1})
+        self.assertEqual(session.request.call_args[0], ("GET", "http://example/api/v1/users/1/posts/"))
+        self.assertEqual(session.request.call_args[1]["params"], {"limit": 1})
+
+        self.assertEqual(api.users.post({"name": "a"}), {"id": 1})
+        self.assertEqual(session.request.call_args[1]["data"], '{"name": "a"}')
+
+        self.assertIn("GET /api/v1/users/{userId}/posts/", get_registry(api).snapshot())
+
+    def test_tastypie_url_cached(self):
+        session = mock.Mock(spec=requests.Session)
+        session.request.return_value = self._response(TASTYPIE)
+
+        api = slumber.API.from_schema("http://example/api/v1/", cache_dir=self.tmpdir, session=session)
+        self.assertEqual(api.entry(1).url(), "http://example/api/v1/entry/1/")
+
+        session.request.side_effect = requests.ConnectionError()
+        api = slumber.API.from_schema("http://example/api/v1/", cache_dir=self.tmpdir, session=session)
+        self.assertEqual(api.entry.url(), "http://example/api/v1/entry/")
+        self.assertEqual(session.request.call_count, 1)
+
+    def test_schema_auth(self):
+        session = mock.Mock(spec=requests.Session)
+        session.auth = None
+        auths = []
+
+        def request(method, url, **kwargs):
+            auths.append(session.auth)
+            return self._response(TASTYPIE)
+
+        session.request.side_effect = request
+        with mock.patch("requests.session", return_value=session):
+            api = slumber.API.from_schema("http://example/api/v1/", auth=("alice", "secret"))
+
+        self.assertEqual(auths, [("alice", "secret")])
+        self.assertTrue(api.entry._store["session"] is session)
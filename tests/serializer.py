@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 import unittest
 import slumber
 import slumber.serialize
@@ -42,3 +43,52 @@ class ResourceTestCase(unittest.TestCase):
         result = s.dumps(self.data, format='yaml')
         self.assertEqual(result, "{foo: bar}\n")
         self.assertEqual(self.data, s.loads(result, format='yaml'))
+
+    def test_available(self):
+        self.assertTrue(slumber.serialize.is_available("json"))
+        self.assertFalse(slumber.serialize.is_available("pickle"))
+
+        s = slumber.serialize.JsonSerializer()
+        self.assertEqual(s.backend.__name__, "json")
+
+    def test_ndjson_get_serializer(self):
+        s = slumber.serialize.Serializer()
+
+        for content_type in [
+            "application/x-ndjson",
+            "application/jsonl",
+            "application/x-jsonlines",
+        ]:
+            serializer = s.get_serializer(content_type=content_type)
+            self.assertEqual(type(serializer), slumber.serialize.NdjsonSerializer,
+                             "content_type %s should produce a NdjsonSerializer")
+
+        rows = ({"id": i} for i in range(3))
+        result = s.dumps(rows, format="ndjson")
+        self.assertFalse(isinstance(result, (bytes, list)))
+        body = b"".join(result)
+        self.assertEqual(body, b'{"id": 0}\n{"id": 1}\n{"id": 2}\n')
+        self.assertEqual(b"".join(s.dumps(self.data, format="ndjson")), b'{"foo": "bar"}\n')
+
+        decoded = s.loads(body + b"\n", format="ndjson")
+        self.assertEqual(next(decoded), {"id": 0})
+        self.assertEqual(list(decoded), [{"id": 1}, {"id": 2}])
+        self.assertEqual(list(s.loads(u'{"id": 0}\n', format="ndjson")), [{"id": 0}])
+
+    def test_loads_bytes(self):
+        s = slumber.serialize.Serializer()
+        body = u'{"foo": "bär"}'
+
+        for key in ("json", "yaml"):
+            serializer = s.get_serializer(key)
+            expected = {"foo": u"bär"}
+            self.assertEqual(serializer.loads_bytes(body.encode("utf-8")), expected)
+            self.assertEqual(serializer.loads_bytes(body.encode("utf-8"), "UTF-8"), expected)
+            self.assertEqual(serializer.loads_bytes(memoryview(body.encode("utf-8"))), expected)
+            self.assertEqual(serializer.loads_bytes(body.encode("latin-1"), "latin-1"), expected)
+
+        json_serializer = s.get_serializer("json")
+        self.assertEqual(json_serializer.loads_bytes(body.encode("utf-16-le")), {"foo": u"bär"})
+
+        ndjson = s.get_serializer("ndjson")
+        self.assertEqual(list(ndjson.loads_bytes(memoryview(b'{"id": 1}\n{"id": 2}\n'))), [{"id": 1}, {"id": 2}])
@@ -0,0 +1,72 @@
+import time
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.slowcalls import SlowCallLog
+from slumber.tracing import Tracer, InMemoryExporter
+
+
+class SlowCallsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 5, "name": "x"}'
+
+        def request(method, url, **kwargs):
+            time.sleep(0.02)
+            return r
+
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.side_effect = request
+        self.logger = mock.Mock()
+
+    def test_slow_call(self):
+        log = SlowCallLog(threshold=0.01, logger=self.logger)
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, slow_calls=log)
+
+        api.users(5).put(data={"name": "x"})
+
+        self.assertEqual(self.logger.log.call_count, 1)
+        args, kwargs = self.logger.log.call_args
+        self.assertTrue(args[2].startswith("PUT /api/v1/users/{id}/"))
+        self.assertEqual(args[5:7], (13, 22))
+        call = kwargs["extra"]["slumber_call"]
+        self.assertEqual(sorted(call["phases"]), ["deserialize", "network", "serialize"])
+        self.assertGreaterEqual(call["phases"]["network"], 0.02)
+        self.assertEqual(log.snapshot(), {"calls": 1, "slow_calls": 1})
+
+        # Only the detector is configured, so nothing is propagated upstream
+        self.assertNotIn("traceparent", self.session.request.call_args[1]["headers"])
+
+    def test_fast_call(self):
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, slow_calls=1)
+        api.users.get()
+        tracer = api._store["tracer"]
+        self.assertEqual(tracer.processors[0].snapshot(), {"calls": 1, "slow_calls": 0})
+        self.assertEqual(tracer.processors[0].threshold, 1)
+
+    def test_profile(self):
+        log = SlowCallLog(threshold=0.01, logger=self.logger, profile_rate=1)
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, slow_calls=log)
+        api.users.get()
+
+        args, kwargs = self.logger.log.call_args
+        self.assertIn("function calls", args[-1])
+
+    def test_with_tracer(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter, sample_rate=0)
+        log = SlowCallLog(threshold=0.01, logger=self.logger)
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session, tracer=tracer, slow_calls=log)
+
+        api.users.get()
+
+        # Calls are checked even when their trace isn't sampled
+        self.assertEqual(exporter.spans, [])
+        self.assertEqual(self.logger.log.call_count, 1)
+        self.assertIn("traceparent", self.session.request.call_args[1]["headers"])
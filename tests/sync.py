@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.sync import SyncStore
+
+
+class SyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = SyncStore(os.path.join(self.tmpdir, "sync.db"))
+        self.session = mock.Mock(spec=requests.Session)
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _response(self, data, status_code=200, etag=None):
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = status_code
+        r.headers = {"content-type": "application/json"}
+        if etag is not None:
+            r.headers["etag"] = etag
+        r.content = json.dumps(data).encode("utf-8") if data is not None else b""
+        return r
+
+    def test_full_sync(self):
+        self.session.request.return_value = self._response([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        result = self.store.sync(self.api.users)
+        self.assertTrue(result.full)
+        self.assertEqual([obj["id"] for obj in result.inserted], [1, 2])
+
+        self.session.request.return_value = self._response([{"id": 2, "name": "c"}, {"id": 3, "name": "d"}])
+        result = self.store.sync(self.api.users)
+        self.assertEqual([obj["id"] for obj in result.inserted], [3])
+        self.assertEqual([obj["id"] for obj in result.updated], [2])
+        self.assertEqual(result.deleted, ["1"])
+        self.assertEqual(len(result), 3)
+
+        result = self.store.sync(self.api.users)
+        self.assertEqual((len(result), result.unchanged), (0, 2))
+
+    def test_incremental_sync(self):
+        self.session.request.return_value = self._response([
+            {"id": 1, "updated_at": "2016-01-01T10:00:00"},
+            {"id": 2, "updated_at": "2016-01-02T10:00:00"},
+        ])
+        self.store.sync(self.api.users, version_field="updated_at", since_param="updated_since",
+                        deleted_field="deleted")
+
+        self.session.request.return_value = self._response([
+            {"id": 2, "updated_at": "2016-01-03T10:00:00"},
+            {"id": 1, "updated_at": "2016-01-04T10:00:00", "deleted": True},
+        ])
+        result = self.store.sync(self.api.users, version_field="updated_at", since_param="updated_since",
+                                 deleted_field="deleted")
+
+        self.assertFalse(result.full)
+        self.assertEqual(self.session.request.call_args[1]["params"], {"updated_since": "2016-01-02T10:00:00"})
+        self.assertEqual([obj["id"] for obj in result.updated], [2])
+        self.assertEqual(result.deleted, ["1"])
+
+        self.session.request.return_value = self._response([])
+        self.store.sync(self.api.users, version_field="updated_at", since_param="updated_since")
+        self.assertEqual(self.session.request.call_args[1]["params"], {"updated_since": "2016-01-04T10:00:00"})
+
+    def test_numeric_cursor(self):
+        for first, second in [(9, 10), ("9", "10")]:
+            self.session.request.return_value = self._response([{"id": 1, "rev": first}])
+            self.store.sync(self.api.users, version_field="rev", since_param="since", full=True)
+
+            self.session.request.return_value = self._response([{"id": 1, "rev": second}])
+            self.store.sync(self.api.users, version_field="rev", since_param="since")
+            self.assertEqual(self.session.request.call_args[1]["params"], {"since": first})
+
+            self.session.request.return_value = self._response([])
+            self.store.sync(self.api.users, version_field="rev", since_param="since")
+            self.assertEqual(self.session.request.call_args[1]["params"], {"since": second})
+
+    def test_text_cursor(self):
+        # Stores written before cursors were kept as json
+        self.store._conn.execute("INSERT INTO collections (collection, cursor, etag, generation) VALUES (?, ?, ?, ?)",
+                                 (self.api.users.url(), "2016-01-01T10:00:00", None, 1))
+        self.session.request.return_value = self._response([])
+        self.store.sync(self.api.users, version_field="updated_at", since_param="updated_since")
+        self.assertEqual(self.session.request.call_args[1]["params"], {"updated_since": "2016-01-01T10:00:00"})
+
+    def test_pagination(self):
+        pages = [
+            self._response({"meta": {"next": "/api/v1/users/?limit=1&offset=1"}, "objects": [{"id": 1}]}),
+            self._response({"meta": {"next": None}, "objects": [{"id": 2}]}),
+        ]
+        self.session.request.side_effect = pages
+        result = self.store.sync(self.api.users)
+
+        self.assertEqual([obj["id"] for obj in result.inserted], [1, 2])
+        self.assertEqual(self.session.request.call_args[1]["params"], {"limit": "1", "offset": "1"})
+
+    def test_not_modified(self):
+        self.session.request.return_value = self._response([{"id": 1}], etag='"v1"')
+        self.store.sync(self.api.users)
+
+        self.session.request.return_value = self._response(None, status_code=304)
+        result = self.store.sync(self.api.users)
+
+        self.assertTrue(result.not_modified)
+        self.assertEqual(self.session.request.call_args[1]["headers"]["If-None-Match"], '"v1"')
+
+        # A 304 keeps the stored state, including the objects
+        self.session.request.return_value = self._response([{"id": 1}])
+        self.assertEqual(self.store.sync(self.api.users).unchanged, 1)
@@ -0,0 +1,80 @@
+import mock
+import requests
+import slumber
+import unittest2 as unittest
+
+from slumber.tracing import Tracer, InMemoryExporter, parse_traceparent
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = InMemoryExporter()
+        self.tracer = Tracer(self.exporter)
+
+        r = mock.Mock(spec=requests.Response)
+        r.status_code = 200
+        r.headers = {"content-type": "application/json"}
+        r.content = b'{"id": 5}'
+
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.return_value = r
+        self.api = slumber.API(base_url="http://example/api/v1/", session=self.session, tracer=self.tracer)
+
+    def test_parse_traceparent(self):
+        trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+        self.assertEqual(parse_traceparent("00-%s-%s-01" % (trace_id, span_id)), (trace_id, span_id, True))
+        self.assertEqual(parse_traceparent("00-%s-%s-00" % (trace_id, span_id)), (trace_id, span_id, False))
+        self.assertEqual(parse_traceparent("00-%s-%s-01" % ("0" * 32, span_id)), None)
+        self.assertEqual(parse_traceparent("garbage"), None)
+        self.assertEqual(parse_traceparent(None), None)
+
+    def test_spans(self):
+        self.api.users(5).put(data={"name": "x"})
+
+        root, = self.exporter.get("PUT /api/v1/users/{id}/")
+        serialize, = self.exporter.get("serialize")
+        network, = self.exporter.get("network")
+        deserialize, = self.exporter.get("deserialize")
+
+        self.assertEqual(root.parent_id, None)
+        self.assertEqual(root.attributes["http.url"], "http://example/api/v1/users/5/")
+        for span in (serialize, network, deserialize):
+            self.assertEqual(span.trace_id, root.trace_id)
+            self.assertEqual(span.parent_id, root.span_id)
+            self.assertGreaterEqual(root.duration, span.duration)
+        self.assertEqual(network.attributes["http.status_code"], 200)
+
+        headers = self.session.request.call_args[1]["headers"]
+        self.assertEqual(headers["traceparent"], network.traceparent)
+        self.assertEqual(self.tracer.current_span(), None)
+
+    def test_parent(self):
+        incoming = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        with self.tracer.span("handler", parent=incoming) as handler:
+            self.api.users.get()
+
+        root, = self.exporter.get("GET /api/v1/users/")
+        self.assertEqual(handler.trace_id, "4bf92f3577b34da6a3ce929d0e0e4736")
+        self.assertEqual(root.trace_id, handler.trace_id)
+        self.assertEqual(root.parent_id, handler.span_id)
+
+    def test_error(self):
+        self.session.request.side_effect = requests.ConnectionError()
+        self.assertRaises(requests.ConnectionError, self.api.users.get)
+
+        root, = self.exporter.get("GET /api/v1/users/")
+        network, = self.exporter.get("network")
+        self.assertEqual(root.attributes["error"], "ReadError")
+        self.assertEqual(network.attributes["error"], "ConnectionError")
+
+    def test_not_sampled(self):
+        self.tracer.sample_rate = 0
+        self.api.users.get()
+        self.assertEqual(self.exporter.spans, [])
+        self.assertTrue(self.session.request.call_args[1]["headers"]["traceparent"].endswith("-00"))
+
+    def test_no_tracer(self):
+        api = slumber.API(base_url="http://example/api/v1/", session=self.session)
+        api.users.get()
+        self.assertNotIn("traceparent", self.session.request.call_args[1]["headers"])
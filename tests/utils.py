@@ -66,3 +66,35 @@ class UtilsTestCase(unittest.TestCase):
         url = slumber.url_join("http://example.com/", "tǝst/".decode('utf8'))
         expected = "http://example.com/tǝst/".decode('utf8')
         self.assertEqual(url, expected)
+
+    def test_project(self):
+        data = {
+            "meta": {"next": "/api/v1/test/?offset=20", "total_count": 100},
+            "objects": [
+                {"id": 1, "name": "a", "tags": ["x"]},
+                {"id": 2, "name": "b", "tags": ["y"]},
+            ],
+        }
+        selector = slumber.compile_fields(["meta.next", "objects[].name", "missing"])
+
+        self.assertEqual(slumber.project(data, selector), {
+            "meta": {"next": "/api/v1/test/?offset=20"},
+            "objects": [{"name": "a"}, {"name": "b"}],
+        })
+
+    def test_compile_fields_whole_field(self):
+        data = {"meta": {"next": None, "total_count": 1}, "objects": [{"id": 1, "name": "a"}]}
+        for fields in (["meta", "meta.next"], ["meta.next", "meta"], ["objects[]", "objects[].id"]):
+            selector = slumber.compile_fields(fields)
+            key = fields[0].split(".")[0].rstrip("[]")
+            self.assertEqual(slumber.project(data, selector), {key: data[key]})
+
+    def test_field_paths(self):
+        self.assertEqual(slumber.utils.field_paths(["meta.next", "objects[].id", "[].name", "objects.id"]),
+                         ["meta.next", "objects.id", "name"])
+
+    def test_project_list(self):
+        data = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+        self.assertEqual(slumber.project(data, slumber.compile_fields(["id"])), [{"id": 1}, {"id": 2}])
+        self.assertEqual(slumber.project(data, slumber.compile_fields(["[].name"])), [{"name": "a"}, {"name": "b"}])